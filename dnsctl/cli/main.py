@@ -1,15 +1,20 @@
-"""dnsctl — Click-based CLI entry point."""
+"""dnsctl — Click-based CLI entry point.
+
+Heavy dependencies (GitPython, requests, cryptography, keyring) are imported
+inside the commands that need them so ``dnsctl --help`` and friends start
+quickly.
+"""
+
+from __future__ import annotations
 
-import getpass
 import logging
+import os
 import sys
+from typing import TYPE_CHECKING
 
 import click
 
 from dnsctl.config import ACCOUNTS_DIR, LOG_FILE, STATE_DIR
-from dnsctl.core.cloudflare_client import CloudflareClient, sanitize_token
-from dnsctl.core.git_manager import GitManager
-from dnsctl.core.security import get_token, is_logged_in, lock, login, logout, unlock
 from dnsctl.core.state_manager import (
     add_account,
     add_protected_record,
@@ -20,8 +25,10 @@ from dnsctl.core.state_manager import (
     init_state_dir,
     list_accounts,
     list_synced_zones,
+    load_all_zones,
     load_protected_records,
     load_zone,
+    load_zone_header,
     remove_account,
     remove_protected_record,
     save_zone,
@@ -29,11 +36,19 @@ from dnsctl.core.state_manager import (
     set_current_account,
     slugify,
 )
-from dnsctl.core.sync_engine import SyncEngine
-from dnsctl.core.validations import validate_record
+
+if TYPE_CHECKING:
+    from dnsctl.core.cloudflare_client import CloudflareClient
+    from dnsctl.core.git_manager import GitManager
+    from dnsctl.core.sync_engine import SyncEngine
 
 logger = logging.getLogger("dnsctl")
-_cf = CloudflareClient()
+
+
+def _get_cf() -> CloudflareClient:
+    """Return the shared CloudflareClient, creating it on first use."""
+    from dnsctl.core.cloudflare_client import get_client
+    return get_client()
 
 
 def _get_alias() -> str:
@@ -42,15 +57,30 @@ def _get_alias() -> str:
 
 
 def _get_git() -> GitManager:
-    """Return a GitManager for the current account."""
-    return GitManager(ACCOUNTS_DIR / _get_alias())
+    """Return the GitManager for the current account, reusing its open repo."""
+    from dnsctl.core.git_manager import get_git_manager
+    return get_git_manager(ACCOUNTS_DIR / _get_alias())
 
 
 def _get_engine() -> SyncEngine:
     """Return a SyncEngine for the current account."""
+    from dnsctl.core.sync_engine import SyncEngine
     return SyncEngine(alias=_get_alias())
 
 
+def _commit(git: GitManager, message: str) -> str | None:
+    """Commit *message*, or queue it when ``DNSCTL_DEFER_COMMIT=1`` is set.
+
+    Queued messages are folded into a single commit by ``dnsctl commit``,
+    so scripted bulk edits pay for one git commit instead of one each.
+    """
+    git.auto_init()
+    if os.environ.get("DNSCTL_DEFER_COMMIT") == "1":
+        git.defer(message)
+        return None
+    return git.commit(message)
+
+
 def _setup_logging(verbose: bool) -> None:
     handlers: list[logging.Handler] = []
     if verbose:
@@ -69,6 +99,7 @@ def _setup_logging(verbose: bool) -> None:
 
 def _require_token() -> str:
     """Return the active token or abort with a helpful message."""
+    from dnsctl.core.security import get_token
     token = get_token(_get_alias())
     if token is None:
         click.echo("Session locked or expired.  Run 'dnsctl unlock' first.", err=True)
@@ -108,6 +139,12 @@ def init() -> None:
 @click.option("--alias", "-a", "acct_alias", default=None, help="Short unique identifier (auto-derived from label if omitted).")
 def login_cmd(label: str | None, acct_alias: str | None) -> None:
     """Store a Cloudflare API token (encrypted with a master password)."""
+    import getpass
+
+    from dnsctl.core.cloudflare_client import sanitize_token
+    from dnsctl.core.git_manager import GitManager
+    from dnsctl.core.security import get_cached_password, login
+
     if not label:
         label = click.prompt("Account name (e.g. Personal, Work, Client A)")
     if not label.strip():
@@ -136,14 +173,13 @@ def login_cmd(label: str | None, acct_alias: str | None) -> None:
     # Verify the token against Cloudflare before storing
     click.echo("Verifying token with Cloudflare…")
     try:
-        _cf.verify_token(token)
+        _get_cf().verify_token(token)
     except Exception as exc:
         click.echo(f"Token verification failed: {exc}", err=True)
         raise SystemExit(1)
     click.echo("Token is valid and active.")
 
     # Reuse the cached password if a session is already active
-    from dnsctl.core.security import get_cached_password
     current_alias = get_current_account()
     cached_pw = get_cached_password(current_alias) if current_alias else None
 
@@ -180,6 +216,10 @@ def login_cmd(label: str | None, acct_alias: str | None) -> None:
 @click.option("--account", "-a", default=None, help="Account alias to unlock.  Defaults to current account.")
 def unlock_cmd(account: str | None) -> None:
     """Unlock the session by entering the master password."""
+    import getpass
+
+    from dnsctl.core.security import is_logged_in, unlock, unlock_all
+
     alias = account or _get_alias()
     if not is_logged_in(alias):
         click.echo(f"No stored token for account \u2018{alias}\u2019.  Run 'dnsctl login' first.", err=True)
@@ -191,7 +231,6 @@ def unlock_cmd(account: str | None) -> None:
         click.echo("Wrong password or corrupted token.", err=True)
         raise SystemExit(1)
     click.echo(f"Session unlocked for account \u2018{alias}\u2019.")
-    from dnsctl.core.security import unlock_all
     other_aliases = [a["alias"] for a in list_accounts() if a["alias"] != alias]
     unlocked = unlock_all(password, other_aliases)
     if unlocked:
@@ -206,38 +245,69 @@ def unlock_cmd(account: str | None) -> None:
 
 @cli.command()
 @click.option("--zone", "-z", default=None, help="Zone name to sync.  Omit to sync all.")
-def sync(zone: str | None) -> None:
+@click.option("--skip-unchanged", is_flag=True,
+              help="Skip zones whose records look unchanged since the last sync.  "
+                   "Heuristic: compares the record count and the newest edit time on "
+                   "the first page of records, so run a full sync periodically.")
+def sync(zone: str | None, skip_unchanged: bool) -> None:
     """Sync DNS records from Cloudflare to local state."""
     init_state_dir()
     token = _require_token()
     alias = _get_alias()
     git = _get_git()
 
-    zones = _cf.list_zones(token)
-    if not zones:
-        click.echo("No zones found for this API token.", err=True)
-        raise SystemExit(1)
-
-    targets = zones
+    cf = _get_cf()
     if zone:
-        targets = [z for z in zones if z["name"] == zone]
-        if not targets:
+        # Look the one zone up directly instead of listing every zone
+        found = cf.get_zone_by_name(token, zone)
+        if found is None:
+            zones = cf.list_zones(token)
             click.echo(f"Zone '{zone}' not found.  Available: {', '.join(z['name'] for z in zones)}", err=True)
             raise SystemExit(1)
+        targets = [found]
+    else:
+        targets = cf.list_zones(token)
+        if not targets:
+            click.echo("No zones found for this API token.", err=True)
+            raise SystemExit(1)
 
     git.auto_init()
 
+    # Per-zone report lines, written in one go once every zone is saved
+    lines: list[str] = []
+    to_fetch = targets
+    # Zone ID → records marker, taken before the fetch so an edit racing it
+    # makes the next run fetch again rather than skip
+    markers: dict[str, str] = {}
+    if skip_unchanged:
+        to_fetch = []
+        for z, marker in zip(targets, cf.records_markers(token, [z["id"] for z in targets])):
+            existing = load_zone_header(z["name"], alias)
+            if existing and existing.get("remote_marker") == marker:
+                lines.append(f"  Skipped {z['name']}  (unchanged since last sync)")
+            else:
+                markers[z["id"]] = marker
+                to_fetch.append(z)
+
+    # Fetch concurrently (network-bound); save each zone, in zone order, as
+    # soon as it arrives rather than holding them all
+    fetched = cf.iter_records_many(token, [z["id"] for z in to_fetch])
+
     zone_counts: list[tuple[str, int]] = []
-    for z in targets:
-        records = _cf.list_records(token, z["id"])
-        state = save_zone(z["id"], z["name"], records, alias)
+    for z, records in zip(to_fetch, fetched):
+        state = save_zone(z["id"], z["name"], records, alias, remote_marker=markers.get(z["id"]))
         zone_counts.append((z["name"], len(records)))
-        click.echo(f"  Synced {z['name']}  ({len(records)} records, hash={state['state_hash'][:12]})")
-
-    from dnsctl.core.commit_messages import sync_message
-    sha = git.commit(sync_message(zone_counts))
-    if sha:
-        click.echo(f"Committed: {sha[:8]}")
+        lines.append(f"  Synced {z['name']}  ({len(records)} records, hash={state['state_hash'][:12]})")
+    if lines:
+        click.echo("\n".join(lines))
+
+    # Nothing was written when every zone was skipped — don't make git
+    # rescan the working tree just to find that out
+    if zone_counts:
+        from dnsctl.core.commit_messages import sync_message
+        sha = git.commit(sync_message(zone_counts))
+        if sha:
+            click.echo(f"Committed: {sha[:8]}")
 
     # Set default zone for this account if not set
     cfg = get_config()
@@ -281,40 +351,48 @@ def _fmt_record(rec: dict) -> str:
 
 def _print_diff(drift) -> None:
     """Print a DiffResult to stdout."""
+    # Collect the lines and write once — one echo per record is slow for
+    # large drift sets
+    lines: list[str] = []
     if drift.added:
-        click.echo("  Added remotely:")
+        lines.append("  Added remotely:")
         for r in drift.added:
-            click.echo(click.style(f"    + {_fmt_record(r)}", fg="cyan"))
+            lines.append(click.style(f"    + {_fmt_record(r)}", fg="cyan"))
     if drift.modified:
-        click.echo("  Modified remotely:")
+        lines.append("  Modified remotely:")
         for m in drift.modified:
             b, a = m["before"], m["after"]
-            click.echo(click.style(
+            lines.append(click.style(
                 f"    ~ {b.get('type', '?'):6s} {b.get('name', '?')}:  "
                 f"{b.get('content', '')} → {a.get('content', '')}",
                 fg="yellow",
             ))
     if drift.removed:
-        click.echo("  Removed remotely:")
+        lines.append("  Removed remotely:")
         for r in drift.removed:
-            click.echo(click.style(f"    - {_fmt_record(r)}", fg="red"))
+            lines.append(click.style(f"    - {_fmt_record(r)}", fg="red"))
+    if lines:
+        click.echo("\n".join(lines))
 
 
 def _print_plan(plan) -> None:
     """Print a Plan's actions to stdout."""
+    lines: list[str] = []
     for a in plan.actions:
         prot = " [PROTECTED]" if a.protected else ""
         if a.action == "create":
-            click.echo(click.style(f"  + CREATE {_fmt_record(a.record)}{prot}", fg="green"))
+            lines.append(click.style(f"  + CREATE {_fmt_record(a.record)}{prot}", fg="green"))
         elif a.action == "update":
             before_content = (a.before or {}).get("content", "?")
-            click.echo(click.style(
+            lines.append(click.style(
                 f"  ~ UPDATE {a.record.get('type', '?'):6s} {a.record.get('name', '?')}:  "
                 f"{before_content} → {a.record.get('content', '')}{prot}",
                 fg="yellow",
             ))
         elif a.action == "delete":
-            click.echo(click.style(f"  - DELETE {_fmt_record(a.record)}{prot}", fg="red"))
+            lines.append(click.style(f"  - DELETE {_fmt_record(a.record)}{prot}", fg="red"))
+    if lines:
+        click.echo("\n".join(lines))
 
 
 # ======================================================================
@@ -361,8 +439,8 @@ def plan_cmd(zone: str | None) -> None:
         else:
             click.echo(f"{z}: {plan.summary}")
             _print_plan(plan)
-            if plan.has_protected:
-                n = sum(1 for a in plan.actions if a.protected)
+            n = plan.protected_count
+            if n:
                 click.echo(click.style(
                     f"  ⚠ {n} protected record(s) will be skipped without --force",
                     fg="yellow",
@@ -454,6 +532,7 @@ def add_cmd(zone: str | None, rtype: str, rname: str, content: str,
     if rtype in ("MX", "SRV"):
         record["priority"] = priority
 
+    from dnsctl.core.validations import validate_record
     err = validate_record(record)
     if err:
         click.echo(f"Validation error: {err}", err=True)
@@ -462,10 +541,8 @@ def add_cmd(zone: str | None, rtype: str, rname: str, content: str,
     records = state["records"]
     records.append(record)
     save_zone(state["zone_id"], zone_name, records, alias)
-    git = _get_git()
-    git.auto_init()
     from dnsctl.core.commit_messages import add_record_message
-    git.commit(add_record_message(record, zone_name))
+    _commit(_get_git(), add_record_message(record, zone_name))
     click.echo(f"Added {rtype} {rname} → {content}")
     click.echo("Run 'dnsctl plan' to review, then 'dnsctl apply' to push to Cloudflare.")
 
@@ -513,16 +590,21 @@ def edit_cmd(zone: str | None, rname: str, rtype: str, content: str | None,
     if proxied is not None:
         rec["proxied"] = proxied
 
+    # Nothing given, or the same values as before — leave the zone file
+    # and git history alone instead of re-hashing an unchanged zone
+    if rec == old_rec:
+        click.echo(f"No changes to {rtype} {rname}.")
+        return
+
+    from dnsctl.core.validations import validate_record
     err = validate_record(rec)
     if err:
         click.echo(f"Validation error: {err}", err=True)
         raise SystemExit(1)
 
     save_zone(state["zone_id"], zone_name, state["records"], alias)
-    git = _get_git()
-    git.auto_init()
     from dnsctl.core.commit_messages import edit_record_message
-    git.commit(edit_record_message(old_rec, rec, zone_name))
+    _commit(_get_git(), edit_record_message(old_rec, rec, zone_name))
     click.echo(f"Updated {rtype} {rname}")
     click.echo("Run 'dnsctl plan' to review, then 'dnsctl apply' to push to Cloudflare.")
 
@@ -545,20 +627,21 @@ def rm_cmd(zone: str | None, rname: str, rtype: str) -> None:
         click.echo(f"Zone '{zone_name}' not synced.", err=True)
         raise SystemExit(1)
 
-    removed_records = [r for r in state["records"]
-                       if r.get("type") == rtype and r.get("name") == rname]
-    state["records"] = [r for r in state["records"]
-                        if not (r.get("type") == rtype and r.get("name") == rname)]
+    # Split in one pass rather than scanning the zone twice
+    removed_records: list[dict] = []
+    kept: list[dict] = []
+    for r in state["records"]:
+        (removed_records if r.get("type") == rtype and r.get("name") == rname
+         else kept).append(r)
+    state["records"] = kept
 
     if not removed_records:
         click.echo(f"No {rtype} record named '{rname}' found.", err=True)
         raise SystemExit(1)
 
     save_zone(state["zone_id"], zone_name, state["records"], alias)
-    git = _get_git()
-    git.auto_init()
     from dnsctl.core.commit_messages import delete_record_message
-    git.commit(delete_record_message(removed_records[0], zone_name))
+    _commit(_get_git(), delete_record_message(removed_records[0], zone_name))
     click.echo(f"Removed {len(removed_records)} record(s): {rtype} {rname}")
     click.echo("Run 'dnsctl plan' to review, then 'dnsctl apply' to push to Cloudflare.")
 
@@ -597,6 +680,26 @@ def rollback_cmd(commit: str) -> None:
         raise SystemExit(1)
 
 
+# ======================================================================
+# commit (deferred)
+# ======================================================================
+
+@cli.command("commit")
+def commit_cmd() -> None:
+    """Commit changes queued with DNSCTL_DEFER_COMMIT=1 as one commit."""
+    git = _get_git()
+    git.auto_init()
+    n = len(git.pending_messages())
+    if not n:
+        click.echo("No deferred changes to commit.")
+        return
+    sha = git.commit_pending()
+    if sha:
+        click.echo(f"Committed {n} change(s): {sha[:8]}")
+    else:
+        click.echo(f"{n} deferred change(s) left nothing to commit.")
+
+
 # ======================================================================
 # log
 # ======================================================================
@@ -662,10 +765,8 @@ def import_cmd(file: str) -> None:
         n = len(state.get("records", []))
         click.echo(f"Imported {zone_name} ({n} records)")
 
-        git = _get_git()
-        git.auto_init()
         from dnsctl.core.commit_messages import import_message
-        sha = git.commit(import_message(zone_name, n))
+        sha = _commit(_get_git(), import_message(zone_name, n))
         if sha:
             click.echo(f"Committed: {sha[:8]}")
     except ValueError as exc:
@@ -718,6 +819,8 @@ def protected_cmd() -> None:
 @cli.command()
 def status() -> None:
     """Show current dnsctl status."""
+    from dnsctl.core.security import get_token, is_logged_in
+
     alias = _get_alias()
     click.echo(f"State directory: {STATE_DIR}")
 
@@ -735,15 +838,13 @@ def status() -> None:
         click.echo(f"Logged in: {is_logged_in(alias)}")
         click.echo(f"Session active: {get_token(alias) is not None}")
 
-    synced = list_synced_zones(alias)
+    synced = load_all_zones(alias)
     if synced:
         click.echo(f"Synced zones ({len(synced)}):")
-        for name in synced:
-            state = load_zone(name, alias)
-            if state:
-                n = len(state.get("records", []))
-                ts = state.get("last_synced_at", "?")
-                click.echo(f"  {name}  ({n} records, last sync: {ts})")
+        for name, state in synced.items():
+            n = len(state.get("records", []))
+            ts = state.get("last_synced_at", "?")
+            click.echo(f"  {name}  ({n} records, last sync: {ts})")
     else:
         click.echo("No zones synced yet.  Run 'dnsctl sync'.")
 
@@ -760,6 +861,7 @@ def status() -> None:
 @cli.command("lock")
 def lock_cmd() -> None:
     """Lock the current session (clear cached token)."""
+    from dnsctl.core.security import lock
     lock(_get_alias())
     click.echo("Session locked.")
 
@@ -774,6 +876,7 @@ def lock_cmd() -> None:
 @cli.command("logout")
 def logout_cmd() -> None:
     """Remove all stored credentials for the current account."""
+    from dnsctl.core.security import logout
     alias = _get_alias()
     logout(alias)
     click.echo(f"Logged out account \u2018{alias}\u2019.  All stored credentials removed.")
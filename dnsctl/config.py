@@ -19,11 +19,24 @@ METADATA_FILE = STATE_DIR / "metadata.json"
 CONFIG_FILE = STATE_DIR / "config.json"
 SESSION_FILE = STATE_DIR / ".session"
 GITIGNORE_FILE = STATE_DIR / ".gitignore"
+# Larger import files are rejected before parsing
+IMPORT_MAX_BYTES = 100 * 1024 * 1024
 
 # ---------------------------------------------------------------------------
 # Cloudflare API
 # ---------------------------------------------------------------------------
 CLOUDFLARE_API_BASE = "https://api.cloudflare.com/client/v4"
+# Upper bound on concurrent record fetches when syncing several zones
+SYNC_MAX_WORKERS = 8
+# Upper bound on concurrent page fetches within one paginated listing
+PAGE_MAX_WORKERS = 4
+# Upper bound on concurrent record writes when applying a plan
+APPLY_MAX_WORKERS = 8
+# Largest plan sent as one batch request (Cloudflare's lowest plan limit)
+APPLY_BATCH_MAX = 200
+# Oldest plan whose remote snapshot is trusted as the post-apply state;
+# older plans (e.g. left open in the GUI) refetch the zone instead
+PLAN_SNAPSHOT_MAX_AGE_SECONDS = 30
 
 # ---------------------------------------------------------------------------
 # Supported DNS record types
@@ -36,6 +49,11 @@ SUPPORTED_RECORD_TYPES = ("A", "AAAA", "CNAME", "MX", "TXT", "SRV")
 KEYRING_SERVICE_ENCRYPTED = "dnsctl_encrypted_token"
 KEYRING_SERVICE_SESSION = "dnsctl_session"
 KEYRING_USERNAME = "dnsctl"
+# Argon2id key derivation (memory cost in KiB)
+ARGON2_ITERATIONS = 3
+ARGON2_MEMORY_COST = 64 * 1024  # 64 MiB
+ARGON2_LANES = 4
+# Only used to read credentials stored before the switch to Argon2id
 PBKDF2_ITERATIONS = 200_000
 SESSION_TIMEOUT_SECONDS = 15 * 60  # 15 minutes
 
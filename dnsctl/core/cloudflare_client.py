@@ -1,22 +1,46 @@
 """Cloudflare API client — zone and DNS record operations."""
 
 import logging
+import random
 import re
+import sys
+import threading
 import time
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Sequence
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from dnsctl.config import CLOUDFLARE_API_BASE, SUPPORTED_RECORD_TYPES
+from dnsctl.config import (
+    CLOUDFLARE_API_BASE,
+    PAGE_MAX_WORKERS,
+    SUPPORTED_RECORD_TYPES,
+    SYNC_MAX_WORKERS,
+)
+from dnsctl.core import serialization
 
 logger = logging.getLogger(__name__)
 
 # Maximum retries on 429 (rate-limited) responses
 _MAX_RETRIES = 5
 _BACKOFF_BASE = 1.0  # seconds
+_BACKOFF_MAX = 30.0  # seconds, before jitter
+
+# Page size for DNS record listings (list_records and records_marker)
+_RECORDS_PER_PAGE = 100
 
 # Cloudflare API tokens are 40-char alphanumeric strings with hyphens/underscores
-_TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9_\-]{20,}$")
+_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9_\-]{20,}")
+
+
+def _backoff(attempt: int) -> float:
+    """Seconds to wait before retry *attempt* (0-based).
+
+    Exponential with a cap, scaled by a random factor in [0.5, 1.5) so
+    clients that failed together don't all retry at the same moment.
+    """
+    return min(_BACKOFF_MAX, _BACKOFF_BASE * (2 ** attempt)) * (0.5 + random.random())
 
 
 class CloudflareAPIError(Exception):
@@ -62,7 +86,7 @@ def sanitize_token(raw: str) -> str:
     # Final validation
     if not cleaned:
         raise ValueError("Token is empty.")
-    if not _TOKEN_PATTERN.match(cleaned):
+    if not _TOKEN_PATTERN.fullmatch(cleaned):
         raise ValueError(
             "Invalid API token format.\n"
             "A Cloudflare API token should be an alphanumeric string "
@@ -81,16 +105,24 @@ class CloudflareClient:
 
     def __init__(self) -> None:
         self._session = requests.Session()
+        self._session.headers["Content-Type"] = "application/json"
+        # One host, reached by up to SYNC_MAX_WORKERS zone fetches each
+        # paging with PAGE_MAX_WORKERS threads: keep a kept-alive connection
+        # per thread so none pays a fresh TLS handshake.  Retries stay in
+        # _request (it honours Retry-After).
+        self._session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=1, pool_maxsize=SYNC_MAX_WORKERS * PAGE_MAX_WORKERS),
+        )
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
     def _headers(self, token: str) -> dict[str, str]:
-        return {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-        }
+        # Only the per-call part; constant headers live on the session.
+        # The token is deliberately not stored on the (shared) session.
+        return {"Authorization": f"Bearer {token}"}
 
     def _request(
         self,
@@ -112,21 +144,21 @@ class CloudflareClient:
                 )
             except requests.ConnectionError as exc:
                 if attempt < _MAX_RETRIES - 1:
-                    wait = _BACKOFF_BASE * (2 ** attempt)
+                    wait = _backoff(attempt)
                     logger.warning("Connection error, retrying in %.1fs: %s", wait, exc)
                     time.sleep(wait)
                     continue
                 raise CloudflareAPIError(0, [{"message": f"Connection failed: {exc}"}]) from exc
             except requests.Timeout as exc:
                 if attempt < _MAX_RETRIES - 1:
-                    wait = _BACKOFF_BASE * (2 ** attempt)
+                    wait = _backoff(attempt)
                     logger.warning("Request timed out, retrying in %.1fs: %s", wait, exc)
                     time.sleep(wait)
                     continue
                 raise CloudflareAPIError(0, [{"message": f"Request timed out: {exc}"}]) from exc
 
             if resp.status_code == 429:
-                wait = _BACKOFF_BASE * (2 ** attempt)
+                wait = _backoff(attempt)
                 retry_after = resp.headers.get("Retry-After")
                 if retry_after:
                     try:
@@ -137,7 +169,7 @@ class CloudflareClient:
                 time.sleep(wait)
                 continue
 
-            data = resp.json()
+            data = serialization.loads(resp.content)
             if not data.get("success", False):
                 raise CloudflareAPIError(resp.status_code, data.get("errors", []))
             return data
@@ -145,6 +177,39 @@ class CloudflareClient:
         # Exhausted retries
         raise CloudflareAPIError(429, [{"message": "Rate-limit retries exhausted"}])
 
+    def _get_all_pages(
+        self,
+        path: str,
+        token: str,
+        per_page: int,
+        convert: Callable[[list[dict]], list] = list,
+    ) -> list:
+        """Return the ``result`` items of every page of a paginated GET.
+
+        Page 1 reports ``total_pages``; the remaining pages are independent
+        and fetched concurrently (up to ``PAGE_MAX_WORKERS`` at once).
+        Each page's items are passed through *convert* as soon as it
+        arrives, so only the converted items outlive the raw response.
+        Items keep page order.
+        """
+        def fetch(page: int) -> list:
+            return convert(self._request(
+                "GET", path, token, params={"page": page, "per_page": per_page}
+            )["result"])
+
+        first = self._request(
+            "GET", path, token, params={"page": 1, "per_page": per_page}
+        )
+        total_pages = first.get("result_info", {}).get("total_pages", 1)
+        items = convert(first["result"])
+        del first
+        if total_pages > 1:
+            workers = min(PAGE_MAX_WORKERS, total_pages - 1)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for page_items in pool.map(fetch, range(2, total_pages + 1)):
+                    items.extend(page_items)
+        return items
+
     # ------------------------------------------------------------------
     # Token verification
     # ------------------------------------------------------------------
@@ -166,21 +231,24 @@ class CloudflareClient:
     def list_zones(self, token: str) -> list[dict]:
         """Return all zones accessible with *token*.
 
-        Each dict contains at least ``id`` and ``name``.
+        Each dict contains at least ``id`` and ``name``, plus the zone's
+        ``modified_on`` timestamp when Cloudflare reports one.
         """
-        zones: list[dict] = []
-        page = 1
-        while True:
-            data = self._request(
-                "GET", "/zones", token, params={"page": page, "per_page": 50}
-            )
-            for z in data["result"]:
-                zones.append({"id": z["id"], "name": z["name"], "status": z["status"]})
-            info = data.get("result_info", {})
-            if page >= info.get("total_pages", 1):
-                break
-            page += 1
-        return zones
+        return self._get_all_pages(
+            "/zones", token, 50, lambda page: [_zone_summary(z) for z in page]
+        )
+
+    def get_zone_by_name(self, token: str, name: str) -> dict | None:
+        """Return the zone called *name*, or ``None`` if it isn't accessible.
+
+        Uses the API's ``name`` filter, so only one small page is fetched
+        regardless of how many zones the token can see.
+        """
+        data = self._request("GET", "/zones", token, params={"name": name})
+        for z in data["result"]:
+            if z["name"] == name:
+                return _zone_summary(z)
+        return None
 
     # ------------------------------------------------------------------
     # DNS Records
@@ -188,23 +256,58 @@ class CloudflareClient:
 
     def list_records(self, token: str, zone_id: str) -> list[dict]:
         """Return all supported DNS records for *zone_id*."""
-        records: list[dict] = []
-        page = 1
-        while True:
-            data = self._request(
-                "GET",
-                f"/zones/{zone_id}/dns_records",
-                token,
-                params={"page": page, "per_page": 100},
-            )
-            for r in data["result"]:
-                if r["type"] in SUPPORTED_RECORD_TYPES:
-                    records.append(_normalize_record(r))
-            info = data.get("result_info", {})
-            if page >= info.get("total_pages", 1):
-                break
-            page += 1
-        return records
+        return self._get_all_pages(
+            f"/zones/{zone_id}/dns_records", token, _RECORDS_PER_PAGE, _supported_records
+        )
+
+    def records_marker(self, token: str, zone_id: str) -> str:
+        """Return a cheap change marker for the DNS records of *zone_id*.
+
+        One request: the record count plus the newest record ``modified_on``
+        on the first page.  The zone's own ``modified_on`` tracks zone
+        settings, not record edits, so ``sync --skip-unchanged`` compares
+        this instead.  It is a heuristic — an edit to a record past the
+        first page that keeps the count the same goes unnoticed.
+        """
+        data = self._request(
+            "GET", f"/zones/{zone_id}/dns_records", token,
+            params={"page": 1, "per_page": _RECORDS_PER_PAGE},
+        )
+        page = data["result"]
+        total = data.get("result_info", {}).get("total_count", len(page))
+        newest = max((r.get("modified_on") or "" for r in page), default="")
+        return f"{total}:{newest}"
+
+    def records_markers(self, token: str, zone_ids: list[str]) -> list[str]:
+        """Return :meth:`records_marker` for each of *zone_ids*, fetched concurrently."""
+        if len(zone_ids) <= 1:
+            return [self.records_marker(token, zid) for zid in zone_ids]
+        workers = min(SYNC_MAX_WORKERS, len(zone_ids))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda zid: self.records_marker(token, zid), zone_ids))
+
+    def list_records_many(self, token: str, zone_ids: list[str]) -> list[list[dict]]:
+        """Return :meth:`list_records` for each of *zone_ids*, in the same order.
+
+        Zones are fetched concurrently (up to ``SYNC_MAX_WORKERS`` at once),
+        so syncing N zones costs roughly one round trip instead of N.
+        """
+        return list(self.iter_records_many(token, zone_ids))
+
+    def iter_records_many(self, token: str, zone_ids: list[str]) -> Iterator[list[dict]]:
+        """Like :meth:`list_records_many`, but yield each zone's records in order.
+
+        A zone is handed over as soon as it and all zones before it have
+        arrived, so callers can save and drop it while the rest are still
+        being fetched instead of holding every zone at once.
+        """
+        if len(zone_ids) <= 1:
+            for zid in zone_ids:
+                yield self.list_records(token, zid)
+            return
+        workers = min(SYNC_MAX_WORKERS, len(zone_ids))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(lambda zid: self.list_records(token, zid), zone_ids)
 
     def create_record(self, token: str, zone_id: str, record: dict) -> dict:
         """Create a DNS record and return the normalized result."""
@@ -227,6 +330,38 @@ class CloudflareClient:
         )
         return _normalize_record(data["result"])
 
+    def batch_records(
+        self,
+        token: str,
+        zone_id: str,
+        *,
+        posts: Sequence[dict] = (),
+        puts: Sequence[tuple[str, dict]] = (),
+        deletes: Sequence[str] = (),
+    ) -> dict[str, list[dict]]:
+        """Create, overwrite and delete records in one atomic request.
+
+        *posts* are new records, *puts* are ``(record_id, record)`` pairs and
+        *deletes* are record IDs.  Cloudflare runs deletes first, then puts,
+        then posts, and either applies all of them or none.
+
+        Returns ``{"posts": [...], "puts": [...]}`` with the normalized
+        records in the order they were given.
+        """
+        body = {
+            "deletes": [{"id": rid} for rid in deletes],
+            "puts": [dict(_to_api_payload(rec), id=rid) for rid, rec in puts],
+            "posts": [_to_api_payload(rec) for rec in posts],
+        }
+        data = self._request(
+            "POST", f"/zones/{zone_id}/dns_records/batch", token, json_body=body
+        )
+        result = data["result"]
+        return {
+            "posts": [_normalize_record(r) for r in result.get("posts") or []],
+            "puts": [_normalize_record(r) for r in result.get("puts") or []],
+        }
+
     def delete_record(self, token: str, zone_id: str, record_id: str) -> None:
         """Delete a DNS record."""
         self._request(
@@ -234,23 +369,59 @@ class CloudflareClient:
         )
 
 
+_client: CloudflareClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> CloudflareClient:
+    """Return the process-wide ``CloudflareClient``, creating it on first use.
+
+    Token verification at login and the later sync/plan/apply calls then
+    share one session, so its kept-alive connections (and their TLS
+    handshakes) carry over between them.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = CloudflareClient()
+        return _client
+
+
 # ------------------------------------------------------------------
 # Record normalisation helpers
 # ------------------------------------------------------------------
 
+def _zone_summary(raw: dict) -> dict:
+    """Reduce a Cloudflare zone object to the fields dnsctl uses."""
+    return {
+        "id": raw["id"],
+        "name": raw["name"],
+        "status": raw["status"],
+        "modified_on": raw.get("modified_on"),
+    }
+
+
+def _supported_records(page: list[dict]) -> list[dict]:
+    """Normalize the records of one API page, dropping unsupported types."""
+    return [_normalize_record(r) for r in page if r["type"] in SUPPORTED_RECORD_TYPES]
+
+
 def _normalize_record(raw: dict) -> dict:
     """Transform a Cloudflare API record into a consistent internal format."""
+    # A handful of distinct types across every record: share one string
+    # each, so type comparisons in the record tables hit the identity check
+    rtype = sys.intern(raw["type"])
     rec: dict[str, Any] = {
         "id": raw["id"],
-        "type": raw["type"],
+        "type": rtype,
         "name": raw["name"],
         "content": raw.get("content", ""),
         "ttl": raw.get("ttl", 1),
         "proxied": raw.get("proxied", False),
     }
-    if raw["type"] == "MX":
+    if rtype == "MX":
         rec["priority"] = raw.get("priority", 0)
-    elif raw["type"] == "SRV":
+    elif rtype == "SRV":
         rec["priority"] = raw.get("priority", 0)
         data = raw.get("data", {})
         rec["data"] = {
@@ -119,3 +119,25 @@ def import_message(zone_name: str, n_records: int) -> str:
     subject = f"Import {zone_name} ({n_records} records)"
     body = f"imported {n_records} records from file at {_now_utc()}"
     return f"{subject}\n\n{body}"
+
+
+# ---------------------------------------------------------------------------
+# Batch
+# ---------------------------------------------------------------------------
+
+def batch_message(messages: list[str]) -> str:
+    """Commit message folding several deferred messages into one commit.
+
+    A single message is returned unchanged.
+    """
+    if len(messages) == 1:
+        return messages[0]
+    subject = f"Batch of {len(messages)} changes"
+    body = "\n".join(f"- {m.splitlines()[0]}" for m in messages)
+    return f"{subject}\n\n{body}"
+
+
+def include_pending(message: str, pending: list[str]) -> str:
+    """*message* extended with deferred messages committed alongside it."""
+    body = "\n".join(f"- {m.splitlines()[0]}" for m in pending)
+    return f"{message}\n\nIncludes earlier local edits:\n{body}"
@@ -35,6 +35,20 @@ class DiffResult:
             parts.append(f"~{len(self.modified)} modified")
         return ", ".join(parts) if parts else "No changes"
 
+    def reversed(self) -> "DiffResult":
+        """Return the diff in the opposite direction (target → base).
+
+        Pairing is symmetric, so this is equivalent to swapping the
+        arguments of ``compute_diff`` without matching the sets again.
+        ``unchanged`` keeps the same (equal) records.
+        """
+        return DiffResult(
+            added=list(self.removed),
+            removed=list(self.added),
+            modified=[{"before": m["after"], "after": m["before"]} for m in self.modified],
+            unchanged=list(self.unchanged),
+        )
+
 
 # ------------------------------------------------------------------
 # Record identity & comparison helpers
@@ -58,27 +72,26 @@ def record_key(record: dict) -> tuple:
     return (rtype, name, content)
 
 
-def _comparable(record: dict) -> dict:
-    """Extract the fields that matter for equality comparison."""
-    rtype = record.get("type", "")
-    result = {
-        "type": rtype,
-        "name": record.get("name", ""),
-        "content": record.get("content", ""),
-        "ttl": record.get("ttl", 1),
-        "proxied": record.get("proxied", False),
-    }
-    if rtype == "MX":
-        result["priority"] = record.get("priority", 0)
-    elif rtype == "SRV":
-        result["priority"] = record.get("priority", 0)
-        result["data"] = record.get("data", {})
-    return result
-
-
 def records_equal(a: dict, b: dict) -> bool:
-    """Check if two records are semantically equal (ignoring ``id``)."""
-    return _comparable(a) == _comparable(b)
+    """Check if two records are semantically equal (ignoring ``id``).
+
+    Compares the relevant fields directly and bails out on the first
+    mismatch, so no intermediate objects are built per call.
+    """
+    rtype = a.get("type", "")
+    if rtype != b.get("type", ""):
+        return False
+    if (a.get("name", "") != b.get("name", "")
+            or a.get("content", "") != b.get("content", "")
+            or a.get("ttl", 1) != b.get("ttl", 1)
+            or a.get("proxied", False) != b.get("proxied", False)):
+        return False
+    if rtype == "MX":
+        return a.get("priority", 0) == b.get("priority", 0)
+    if rtype == "SRV":
+        return (a.get("priority", 0) == b.get("priority", 0)
+                and a.get("data", {}) == b.get("data", {}))
+    return True
 
 
 # ------------------------------------------------------------------
@@ -102,60 +115,61 @@ def compute_diff(base: list[dict], target: list[dict]) -> DiffResult:
         2. Fall back to composite key for records without IDs.
     """
     result = DiffResult()
+    base_by_id, base_by_key = _index(base)
+    target_by_id, target_by_key = _index(target)
 
-    # Partition by ID availability
-    base_by_id: dict[str, dict] = {}
-    base_no_id: list[dict] = []
-    for r in base:
-        rid = r.get("id")
-        if rid:
-            base_by_id[rid] = r
-        else:
-            base_no_id.append(r)
+    # --- ID-matched records ---
+    _match(base_by_id, target_by_id, result)
 
-    target_by_id: dict[str, dict] = {}
-    target_no_id: list[dict] = []
-    for r in target:
+    # --- Records without IDs (composite-key matching) ---
+    # Keys are built once per record in _index and matched by hash
+    # lookup, which stays O(n + m); a sort-merge walk would add an
+    # O(n log n) sort for no fewer key constructions.
+    if base_by_key or target_by_key:
+        _match(base_by_key, target_by_key, result)
+
+    return result
+
+
+def _index(records: list[dict]) -> tuple[dict[str, dict], dict[tuple, dict]]:
+    """Partition *records* into ``(by_id, by_key)`` maps.
+
+    Records with a Cloudflare ``id`` are keyed by it; the rest by their
+    ``record_key``, computed once here.
+    """
+    by_id: dict[str, dict] = {}
+    by_key: dict[tuple, dict] = {}
+    for r in records:
         rid = r.get("id")
         if rid:
-            target_by_id[rid] = r
+            by_id[rid] = r
         else:
-            target_no_id.append(r)
+            by_key[record_key(r)] = r
+    return by_id, by_key
 
-    # --- ID-matched records ---
-    for rid, base_rec in base_by_id.items():
-        if rid in target_by_id:
-            target_rec = target_by_id[rid]
-            if records_equal(base_rec, target_rec):
-                result.unchanged.append(base_rec)
-            else:
-                result.modified.append({"before": base_rec, "after": target_rec})
-        else:
-            result.removed.append(base_rec)
-
-    for rid, target_rec in target_by_id.items():
-        if rid not in base_by_id:
-            result.added.append(target_rec)
 
-    # --- Records without IDs (composite-key matching) ---
-    base_key_map = {record_key(r): r for r in base_no_id}
-    target_key_map = {record_key(r): r for r in target_no_id}
+def _match(base_map: dict, target_map: dict, result: DiffResult) -> None:
+    """Classify records of two keyed maps into *result* in a single walk.
 
-    for key, target_rec in target_key_map.items():
-        if key not in base_key_map:
-            result.added.append(target_rec)
+    Each base record is looked up once in *target_map*; the target side is
+    only scanned for additions when some target keys were left unmatched.
+    """
+    matched = 0
+    for key, base_rec in base_map.items():
+        target_rec = target_map.get(key)
+        if target_rec is None:
+            result.removed.append(base_rec)
+            continue
+        matched += 1
+        if records_equal(base_rec, target_rec):
+            result.unchanged.append(base_rec)
         else:
-            base_rec = base_key_map[key]
-            if records_equal(base_rec, target_rec):
-                result.unchanged.append(base_rec)
-            else:
-                result.modified.append({"before": base_rec, "after": target_rec})
-
-    for key, rec in base_key_map.items():
-        if key not in target_key_map:
-            result.removed.append(rec)
+            result.modified.append({"before": base_rec, "after": target_rec})
 
-    return result
+    if matched < len(target_map):
+        result.added.extend(
+            rec for key, rec in target_map.items() if key not in base_map
+        )
 
 
 # ------------------------------------------------------------------
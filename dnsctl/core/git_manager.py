@@ -1,7 +1,11 @@
 """Git manager — auto-managed git repository inside the state directory."""
 
+import functools
 import logging
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
 
 from git import Actor, InvalidGitRepositoryError, Repo
 
@@ -9,6 +13,53 @@ from dnsctl.config import GIT_AUTHOR_EMAIL, GIT_AUTHOR_NAME, STATE_DIR
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on remembered (commit, path) → contents entries per manager
+_BLOB_CACHE_SIZE = 512
+
+_managers: dict[Path, "GitManager"] = {}
+_managers_lock = threading.Lock()
+
+
+def get_git_manager(state_dir: Path) -> "GitManager":
+    """Return the shared ``GitManager`` for *state_dir*, creating it on first use.
+
+    Callers working on the same account get one manager, so the repository
+    is opened once and its blob cache is shared.
+    """
+    with _managers_lock:
+        manager = _managers.get(state_dir)
+        if manager is None:
+            manager = _managers[state_dir] = GitManager(state_dir)
+        return manager
+
+
+def forget_git_manager(state_dir: Path) -> None:
+    """Drop the shared manager for *state_dir* and close its repository.
+
+    Call this when the directory is deleted, so a later account reusing the
+    alias starts from a fresh manager rather than the old ``Repo``.
+    """
+    with _managers_lock:
+        manager = _managers.pop(state_dir, None)
+    if manager is not None:
+        manager.close()
+
+
+def _serialized(method):
+    """Run *method* under the manager's lock.
+
+    Managers are shared (see :func:`get_git_manager`) and the GUI commits
+    from worker threads; git's index must only be changed by one of them
+    at a time, and GitPython's persistent ``cat-file`` process only answers
+    one reader at a time.  The pending-message queue has its own lock (see
+    :meth:`GitManager.deferring`).
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class GitManager:
     """Manages a git repository in ``~/.dnsctl/`` for version tracking."""
@@ -16,13 +67,31 @@ class GitManager:
     def __init__(self, state_dir: Path | None = None) -> None:
         self._dir = state_dir or STATE_DIR
         self._repo: Repo | None = None
+        self._lock = threading.RLock()
+        # Guards the pending-message file and the two counters below; never
+        # held across a git command, so queueing never waits on a commit
+        self._pending_cond = threading.Condition()
+        self._writers = 0        # deferred edits being written right now
+        self._pending_gen = 0    # bumped whenever a deferred edit starts
+        # Contents at a commit never change, so entries stay valid forever
+        self._blob_cache: dict[tuple[str, str], str | None] = {}
 
     # ------------------------------------------------------------------
     # Initialisation
     # ------------------------------------------------------------------
 
+    @_serialized
     def auto_init(self) -> Repo:
-        """Open or create the git repository.  Idempotent."""
+        """Open or create the git repository.  Idempotent.
+
+        The opened ``Repo`` is kept, so repeated calls on one manager are
+        cheap.  It is dropped if its ``.git`` has since been deleted, so git
+        commands never run against a parent directory's repository.
+        """
+        if self._repo is not None:
+            if Path(self._repo.git_dir).is_dir():
+                return self._repo
+            self._close_repo()
         try:
             self._repo = Repo(self._dir)
         except InvalidGitRepositoryError:
@@ -40,32 +109,170 @@ class GitManager:
 
     @property
     def repo(self) -> Repo:
-        if self._repo is None:
-            return self.auto_init()
-        return self._repo
+        return self.auto_init()
+
+    @_serialized
+    def close(self) -> None:
+        """Release the repository and its git processes."""
+        self._close_repo()
+
+    def _close_repo(self) -> None:
+        if self._repo is not None:
+            self._repo.close()
+            self._repo = None
+        self._blob_cache.clear()
 
     # ------------------------------------------------------------------
     # Commit
     # ------------------------------------------------------------------
 
+    @_serialized
     def commit(self, message: str) -> str | None:
         """Stage all changes in the state directory and commit.
 
+        Edits recorded by :meth:`defer` are staged along with everything
+        else, so their messages are listed in this commit's message and
+        the pending queue is cleared.
+
         Returns the commit hex SHA, or ``None`` if there was nothing to commit.
         """
-        repo = self.repo
-        # Stage everything (respects .gitignore)
-        repo.git.add(A=True)
-
-        if not repo.is_dirty(index=True, untracked_files=True):
+        pending = self._stage()
+        if pending:
+            from dnsctl.core.commit_messages import include_pending
+            message = include_pending(message, pending)
+        sha = self._commit(message)
+        self._drop_pending(len(pending))
+        return sha
+
+    def _commit(self, message: str) -> str | None:
+        """Commit what :meth:`_stage` staged."""
+        if not self._has_staged_changes():
             logger.debug("Nothing to commit.")
             return None
 
         author = Actor(GIT_AUTHOR_NAME, GIT_AUTHOR_EMAIL)
-        c = repo.index.commit(message, author=author, committer=author)
+        c = self.repo.index.commit(message, author=author, committer=author)
         logger.info("Committed: %s (%s)", message, c.hexsha[:8])
         return c.hexsha
 
+    def _has_staged_changes(self) -> bool:
+        """Return True if the index differs from HEAD.
+
+        Uses ``diff --cached`` rather than ``is_dirty()``, which compares
+        working-tree vs index (always clean after ``add -A``) and walks
+        untracked files on top — one subprocess instead of several.
+        ``--quiet`` makes git stop at the first difference and answer via
+        its exit status, so no file list is built or parsed.
+        """
+        status, _out, _err = self.repo.git.diff(
+            "--cached", "--quiet",
+            with_extended_output=True, with_exceptions=False,
+        )
+        logger.debug("Staged changes: %s", status != 0)
+        return status != 0
+
+    # ------------------------------------------------------------------
+    # Deferred commits
+    # ------------------------------------------------------------------
+
+    def _pending_file(self) -> Path:
+        # Kept inside .git/ so it is never staged and follows the repo around.
+        # Built from the directory: self.repo would wait on the commit lock.
+        return self._dir / ".git" / "DNSCTL_PENDING"
+
+    @contextmanager
+    def deferring(self, message: str) -> Iterator[None]:
+        """Queue *message* for the edit written inside the ``with`` block.
+
+        Commits wait for the block to finish before staging, so the edit is
+        always committed together with its message.  Queueing itself never
+        waits on a commit in progress.
+        """
+        if not self._pending_file().parent.is_dir():
+            self.auto_init()
+        with self._pending_cond:
+            self._writers += 1
+            self._pending_gen += 1
+            try:
+                with self._pending_file().open("a", encoding="utf-8") as fh:
+                    fh.write(message + "\x1e")
+            except BaseException:
+                self._writers -= 1
+                raise
+        try:
+            yield
+        finally:
+            with self._pending_cond:
+                self._writers -= 1
+                self._pending_cond.notify_all()
+
+    def defer(self, message: str) -> None:
+        """Record *message* for a later :meth:`commit_pending` instead of committing now.
+
+        The edit it describes must already be written; use :meth:`deferring`
+        when a commit may run on another thread meanwhile.
+        """
+        with self.deferring(message):
+            pass
+
+    def pending_messages(self) -> list[str]:
+        """Return the messages recorded by :meth:`defer`, oldest first."""
+        with self._pending_cond:
+            return self._read_pending()
+
+    def _read_pending(self) -> list[str]:
+        path = self._pending_file()
+        if not path.exists():
+            return []
+        return [m for m in path.read_text(encoding="utf-8").split("\x1e") if m]
+
+    def _stage(self) -> list[str]:
+        """Stage the work tree; return the pending messages describing it.
+
+        Waits for deferred edits being written to finish, and stages again
+        if another one started while git was adding files.
+        """
+        repo = self.repo
+        while True:
+            with self._pending_cond:
+                self._pending_cond.wait_for(lambda: not self._writers)
+                generation = self._pending_gen
+                messages = self._read_pending()
+            # Stage everything (respects .gitignore)
+            repo.git.add(A=True)
+            with self._pending_cond:
+                if self._pending_gen == generation:
+                    return messages
+
+    def _drop_pending(self, count: int) -> None:
+        """Remove the oldest *count* messages, keeping any queued since."""
+        if not count:
+            return
+        with self._pending_cond:
+            rest = self._read_pending()[count:]
+            path = self._pending_file()
+            if rest:
+                path.write_text("".join(m + "\x1e" for m in rest), encoding="utf-8")
+            else:
+                path.unlink(missing_ok=True)
+
+    @_serialized
+    def commit_pending(self) -> str | None:
+        """Commit all deferred changes at once with a combined message.
+
+        Returns the commit hex SHA, or ``None`` if nothing was pending or
+        the deferred edits cancelled each other out.
+        """
+        if not self.pending_messages():
+            return None
+        messages = self._stage()
+        if not messages:
+            return None
+        from dnsctl.core.commit_messages import batch_message
+        sha = self._commit(batch_message(messages))
+        self._drop_pending(len(messages))
+        return sha
+
     # ------------------------------------------------------------------
     # Log
     # ------------------------------------------------------------------
@@ -78,19 +285,28 @@ class GitManager:
         - ``message`` — full message including any detail body (backward-compatible:
                         old single-line commits have ``title == message``)
         """
-        repo = self.repo
+        # One ``git log`` call instead of loading each commit object in turn.
+        # Fields are split by US (0x1f) and commits by RS (0x1e), neither of
+        # which can appear in our commit messages.
+        raw = self.repo.git.log(
+            f"--max-count={max_count}", "--pretty=format:%H%x1f%an%x1f%cI%x1f%B%x1e",
+        )
         commits = []
-        for c in repo.iter_commits(max_count=max_count):
-            full = c.message.strip()
+        for entry in raw.split("\x1e"):
+            entry = entry.strip("\n")
+            if not entry:
+                continue
+            sha, author, date, message = entry.split("\x1f", 3)
+            full = message.strip()
             title = full.split("\n")[0]
             commits.append(
                 {
-                    "sha": c.hexsha,
-                    "short_sha": c.hexsha[:8],
+                    "sha": sha,
+                    "short_sha": sha[:8],
                     "title": title,
                     "message": full,
-                    "author": str(c.author),
-                    "date": c.committed_datetime.isoformat(),
+                    "author": author,
+                    "date": date,
                 }
             )
         return commits
@@ -99,6 +315,7 @@ class GitManager:
     # Rollback
     # ------------------------------------------------------------------
 
+    @_serialized
     def rollback(self, commit_sha: str) -> str:
         """Restore the working tree to the state at *commit_sha*.
 
@@ -116,6 +333,10 @@ class GitManager:
         except Exception as exc:
             raise ValueError(f"Cannot resolve commit '{commit_sha}': {exc}") from exc
 
+        # Deferred edits are about to be overwritten; record them first so
+        # the rollback can itself be undone
+        self.commit_pending()
+
         head_sha = repo.head.commit.hexsha
         logger.debug(
             "Rollback: target=%s  head=%s  repo=%s",
@@ -163,14 +384,9 @@ class GitManager:
             repo.git.add(A=True)
 
             # ------------------------------------------------------------------
-            # Step 4 — check for staged changes using diff --cached rather than
-            # is_dirty(), which compares working-tree vs index (always clean after
-            # add -A) instead of index vs HEAD.
+            # Step 4 — check for staged changes (index vs HEAD).
             # ------------------------------------------------------------------
-            staged_files = repo.git.diff("--cached", "--name-only").strip()
-            logger.debug("Rollback: staged files = %r", staged_files)
-
-            if not staged_files:
+            if not self._has_staged_changes():
                 logger.info(
                     "Rollback: nothing to commit — working tree already matches %s",
                     target.hexsha[:8],
@@ -201,10 +417,36 @@ class GitManager:
 
     def show_file_at(self, commit_sha: str, relative_path: str) -> str | None:
         """Return file contents at *commit_sha*, or ``None`` if absent."""
-        repo = self.repo
+        return self.show_files_at(commit_sha, [relative_path])[relative_path]
+
+    @_serialized
+    def show_files_at(self, commit_sha: str, relative_paths: list[str]) -> dict[str, str | None]:
+        """Return ``{path: contents}`` at *commit_sha*; ``None`` for absent paths.
+
+        The commit and its tree are resolved once for all paths; blobs are
+        read through GitPython's persistent ``cat-file --batch`` process, so
+        no git subprocess is started per file.  Results are remembered per
+        commit, so revisiting a commit reads nothing from git.
+        """
+        result: dict[str, str | None] = dict.fromkeys(relative_paths)
         try:
-            target = repo.commit(commit_sha)
-            blob = target.tree / relative_path
-            return blob.data_stream.read().decode("utf-8")
-        except (KeyError, Exception):
-            return None
+            commit = self.repo.commit(commit_sha)
+        except Exception:
+            return result
+        cache = self._blob_cache
+        tree = None
+        for path in relative_paths:
+            key = (commit.hexsha, path)
+            if key in cache:
+                result[path] = cache[key]
+                continue
+            if tree is None:
+                tree = commit.tree
+            try:
+                result[path] = (tree / path).data_stream.read().decode("utf-8")
+            except Exception:
+                pass
+            if len(cache) >= _BLOB_CACHE_SIZE:
+                del cache[next(iter(cache))]
+            cache[key] = result[path]
+        return result
@@ -1,4 +1,4 @@
-"""Secure token storage — AES-256-GCM + PBKDF2 + OS keyring.
+"""Secure token storage — AES-256-GCM + Argon2id + OS keyring.
 
 All public functions accept an *alias* parameter identifying which
 Cloudflare account the credential belongs to.  Account credentials are
@@ -7,73 +7,202 @@ per-account session file lives at ``~/.dnsctl/accounts/<alias>/.session``.
 """
 
 import base64
-import json
 import os
+import struct
 import time
 from pathlib import Path
 
 import keyring
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.argon2 import Argon2id
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives import hashes
 
 from dnsctl.config import (
     ACCOUNTS_DIR,
+    ARGON2_ITERATIONS,
+    ARGON2_LANES,
+    ARGON2_MEMORY_COST,
     KEYRING_SERVICE_ENCRYPTED,
     KEYRING_SERVICE_SESSION,
     PBKDF2_ITERATIONS,
     SESSION_TIMEOUT_SECONDS,
 )
+from dnsctl.core import serialization
 
 # ---------------------------------------------------------------------------
 # In-memory password cache (cleared on lock/logout, never written to disk)
 # ---------------------------------------------------------------------------
 _session_passwords: dict[str, str] = {}
 
+# Plaintext session tokens already fetched from the keyring this process,
+# tagged with the version of the session file they were read under.  The
+# session file is still checked on every access so that a lock from another
+# process (or an expired timeout) is honoured, and a session file written
+# by another process (a fresh unlock) makes the next access re-read the
+# keyring.
+_token_cache: dict[str, tuple[tuple[int, int], str]] = {}
+
+# Keys derived while decrypting, keyed by (password, salt, kdf params), so
+# re-reading the same blob only pays for the KDF once per session.  Same
+# lifetime rules as the password cache.
+_derived_keys: dict[tuple[str, bytes, tuple], bytes] = {}
+# alias → the _derived_keys entry its last unlock used, so locking one
+# account only evicts that account's key
+_derived_key_owners: dict[str, tuple[str, bytes, tuple]] = {}
+
 
 # ---------------------------------------------------------------------------
 # Key derivation
 # ---------------------------------------------------------------------------
 
-def _derive_key(password: str, salt: bytes) -> bytes:
-    """Derive a 256-bit key from *password* and *salt* using PBKDF2."""
-    kdf = PBKDF2HMAC(
+# KDF parameter sets.  The parameters are stored in every blob so raising
+# the defaults later never strands existing credentials.
+_DEFAULT_KDF: tuple = ("argon2id", ARGON2_ITERATIONS, ARGON2_MEMORY_COST, ARGON2_LANES)
+# Blobs written before the switch to Argon2id
+_LEGACY_KDF: tuple = ("pbkdf2", PBKDF2_ITERATIONS)
+
+
+def derive_key_from_password(
+    password: str, salt: bytes, kdf: tuple | None = None,
+) -> bytes:
+    """Derive a 256-bit key from *password* and *salt*.
+
+    Uses Argon2id by default; *kdf* selects another parameter set (e.g. the
+    PBKDF2 one needed to read older blobs).  The returned key can be handed
+    to ``encrypt_with_key`` / ``decrypt_with_key`` any number of times, so
+    batch operations only pay for the (deliberately slow) derivation once.
+    """
+    if kdf is None:
+        kdf = _DEFAULT_KDF
+    if kdf[0] == "argon2id":
+        _name, iterations, memory_cost, lanes = kdf
+        return Argon2id(
+            salt=salt,
+            length=32,
+            iterations=iterations,
+            lanes=lanes,
+            memory_cost=memory_cost,
+        ).derive(password.encode("utf-8"))
+
+    _name, iterations = kdf
+    return PBKDF2HMAC(
         algorithm=hashes.SHA256(),
         length=32,
         salt=salt,
-        iterations=PBKDF2_ITERATIONS,
-    )
-    return kdf.derive(password.encode("utf-8"))
+        iterations=iterations,
+    ).derive(password.encode("utf-8"))
+
+
+def _derive_key(password: str, salt: bytes, kdf: tuple) -> bytes:
+    """Return the key for *password* / *salt* / *kdf*, deriving it at most once."""
+    cache_key = (password, salt, kdf)
+    key = _derived_keys.get(cache_key)
+    if key is None:
+        key = derive_key_from_password(password, salt, kdf)
+        _derived_keys[cache_key] = key
+    return key
 
 
 # ---------------------------------------------------------------------------
 # Encrypt / Decrypt
 # ---------------------------------------------------------------------------
 
+# Binary envelope: a one-byte format tag followed by the raw fields, base64'd
+# once because the keyring only stores strings.  Blobs written by older
+# releases are base64 JSON and always start with ``{`` once decoded.
+_BLOB_KEYED = b"\x02"   # tag || nonce(12) || ct
+_BLOB_ARGON2 = b"\x03"  # tag || iterations, memory, lanes || salt(16) || nonce(12) || ct
+_ARGON2_PARAMS = struct.Struct(">IIB")
+_SALT_LEN = 16
+_NONCE_LEN = 12
+
+
+def _encode_blob(salt: bytes | None, nonce: bytes, ct: bytes) -> str:
+    if salt is None:
+        raw = _BLOB_KEYED + nonce + ct
+    else:
+        _name, iterations, memory_cost, lanes = _DEFAULT_KDF
+        params = _ARGON2_PARAMS.pack(iterations, memory_cost, lanes)
+        raw = _BLOB_ARGON2 + params + salt + nonce + ct
+    return base64.b64encode(raw).decode()
+
+
+def _decode_blob(
+    encoded_blob: str,
+) -> tuple[tuple | None, bytes | None, bytes, bytes]:
+    """Split a blob into ``(kdf, salt, nonce, ct)``.
+
+    *kdf* and *salt* are ``None`` for blobs from ``encrypt_with_key``.
+    """
+    raw = base64.b64decode(encoded_blob)
+    tag = raw[:1]
+    if tag == _BLOB_ARGON2:
+        salt_start = 1 + _ARGON2_PARAMS.size
+        iterations, memory_cost, lanes = _ARGON2_PARAMS.unpack(raw[1:salt_start])
+        kdf = ("argon2id", iterations, memory_cost, lanes)
+        salt_end = salt_start + _SALT_LEN
+        nonce_end = salt_end + _NONCE_LEN
+        return kdf, raw[salt_start:salt_end], raw[salt_end:nonce_end], raw[nonce_end:]
+    if tag == _BLOB_KEYED:
+        nonce_end = 1 + _NONCE_LEN
+        return None, None, raw[1:nonce_end], raw[nonce_end:]
+    # Legacy JSON envelope (PBKDF2)
+    blob = serialization.loads(raw)
+    salt = base64.b64decode(blob["salt"]) if "salt" in blob else None
+    kdf = _LEGACY_KDF if salt is not None else None
+    return kdf, salt, base64.b64decode(blob["nonce"]), base64.b64decode(blob["ct"])
+
+
+def encrypt_with_key(key: bytes, token: str) -> str:
+    """Encrypt *token* with an already-derived *key*.
+
+    The returned blob holds only the nonce and ciphertext; the caller is
+    responsible for keeping track of the salt the key was derived from.
+    """
+    nonce = os.urandom(_NONCE_LEN)
+    ct = AESGCM(key).encrypt(nonce, token.encode("utf-8"), None)
+    return _encode_blob(None, nonce, ct)
+
+
+def decrypt_with_key(key: bytes, encoded_blob: str) -> str:
+    """Decrypt *encoded_blob* with an already-derived *key*.
+
+    Accepts both salt-less blobs from ``encrypt_with_key`` and full blobs
+    from ``_encrypt_token`` (the embedded salt is ignored).
+    """
+    _kdf, _salt, nonce, ct = _decode_blob(encoded_blob)
+    return AESGCM(key).decrypt(nonce, ct, None).decode("utf-8")
+
+
 def _encrypt_token(token: str, password: str) -> str:
-    """Encrypt *token* with AES-256-GCM.  Returns a base64-encoded JSON blob
-    containing salt, nonce, and ciphertext."""
-    salt = os.urandom(16)
-    key = _derive_key(password, salt)
-    nonce = os.urandom(12)
-    ciphertext = AESGCM(key).encrypt(nonce, token.encode("utf-8"), None)
-    blob = {
-        "salt": base64.b64encode(salt).decode(),
-        "nonce": base64.b64encode(nonce).decode(),
-        "ct": base64.b64encode(ciphertext).decode(),
-    }
-    return base64.b64encode(json.dumps(blob).encode()).decode()
+    """Encrypt *token* with AES-256-GCM.  Returns a base64-encoded binary
+    blob containing the KDF parameters, salt, nonce, and ciphertext."""
+    # A fresh salt every time, so no two blobs ever share a key
+    salt = os.urandom(_SALT_LEN)
+    key = derive_key_from_password(password, salt)
+    nonce = os.urandom(_NONCE_LEN)
+    ct = AESGCM(key).encrypt(nonce, token.encode("utf-8"), None)
+    return _encode_blob(salt, nonce, ct)
 
 
 def _decrypt_token(encoded_blob: str, password: str) -> str:
     """Decrypt *encoded_blob* with *password*.  Raises on wrong password."""
-    blob = json.loads(base64.b64decode(encoded_blob))
-    salt = base64.b64decode(blob["salt"])
-    nonce = base64.b64decode(blob["nonce"])
-    ct = base64.b64decode(blob["ct"])
-    key = _derive_key(password, salt)
-    plaintext = AESGCM(key).decrypt(nonce, ct, None)
-    return plaintext.decode("utf-8")
+    kdf, salt, nonce, ct = _decode_blob(encoded_blob)
+    if salt is None:
+        raise ValueError("Blob carries no salt; use decrypt_with_key().")
+    key = _derive_key(password, salt, kdf)
+    try:
+        return AESGCM(key).decrypt(nonce, ct, None).decode("utf-8")
+    except Exception:
+        # Never keep a key that failed to authenticate
+        _derived_keys.pop((password, salt, kdf), None)
+        raise
+
+
+def _needs_rehash(encoded_blob: str) -> bool:
+    """Return True if *encoded_blob* was derived with non-default KDF params."""
+    return _decode_blob(encoded_blob)[0] != _DEFAULT_KDF
 
 
 # ---------------------------------------------------------------------------
@@ -128,11 +257,17 @@ def unlock(password: str, alias: str) -> str:
         raise ValueError(f"Not logged in for account '{alias}'. Run 'dnsctl login' first.")
 
     token = _decrypt_token(blob, password)
+    kdf, salt, _nonce, _ct = _decode_blob(blob)
+    _derived_key_owners[alias] = (password, salt, kdf)
+    if _needs_rehash(blob):
+        # Upgrade credentials written with older KDF settings
+        keyring.set_password(KEYRING_SERVICE_ENCRYPTED, alias, _encrypt_token(token, password))
 
     # Cache the token in a separate session keyring entry
     keyring.set_password(KEYRING_SERVICE_SESSION, alias, token)
     _session_passwords[alias] = password
     _touch_session(alias)
+    _token_cache[alias] = (_session_sig(_account_session_file(alias)), token)
     return token
 
 
@@ -140,6 +275,10 @@ def unlock(password: str, alias: str) -> str:
 # Session helpers
 # ---------------------------------------------------------------------------
 
+# Minimum age of the session timestamp before get_token() rewrites it
+_SESSION_REFRESH_SECONDS = SESSION_TIMEOUT_SECONDS / 10
+
+
 def _touch_session(alias: str) -> None:
     """Write current Unix timestamp to the session file for *alias*."""
     f = _account_session_file(alias)
@@ -147,8 +286,15 @@ def _touch_session(alias: str) -> None:
     f.write_text(str(time.time()))
 
 
+def _session_sig(f: Path) -> tuple[int, int]:
+    """Identify the current version of session file *f*."""
+    st = f.stat()
+    return (st.st_ino, st.st_mtime_ns)
+
+
 def _clear_session(alias: str) -> None:
     """Remove session token from keyring and delete session file for *alias*."""
+    _token_cache.pop(alias, None)
     try:
         keyring.delete_password(KEYRING_SERVICE_SESSION, alias)
     except keyring.errors.PasswordDeleteError:
@@ -162,7 +308,11 @@ def get_token(alias: str) -> str | None:
     """Return the cached plaintext token for *alias* if the session is still
     valid, otherwise clear the session and return ``None``."""
     f = _account_session_file(alias)
-    if not f.exists():
+    try:
+        sig = _session_sig(f)
+    except FileNotFoundError:
+        # Locked elsewhere; a later session must not see this token
+        _token_cache.pop(alias, None)
         return None
     try:
         ts = float(f.read_text().strip())
@@ -174,16 +324,34 @@ def get_token(alias: str) -> str | None:
         _clear_session(alias)
         return None
 
-    token = keyring.get_password(KEYRING_SERVICE_SESSION, alias)
-    if token is None:
-        _clear_session(alias)
-        return None
-
-    # Refresh the timestamp on each successful access
-    _touch_session(alias)
+    cached = _token_cache.get(alias)
+    if cached is not None and cached[0] == sig:
+        token = cached[1]
+    else:
+        token = keyring.get_password(KEYRING_SERVICE_SESSION, alias)
+        if token is None:
+            _clear_session(alias)
+            return None
+        _token_cache[alias] = (sig, token)
+
+    # Refresh the timestamp, but at most once per tenth of the timeout —
+    # the sliding window barely moves and it saves a file write per call
+    if time.time() - ts > _SESSION_REFRESH_SECONDS:
+        _touch_session(alias)
+        try:
+            _token_cache[alias] = (_session_sig(f), token)
+        except FileNotFoundError:
+            _token_cache.pop(alias, None)
     return token
 
 
+def _forget_derived_key(alias: str) -> None:
+    """Evict the key *alias* was unlocked with, unless another account uses it."""
+    cache_key = _derived_key_owners.pop(alias, None)
+    if cache_key is not None and cache_key not in _derived_key_owners.values():
+        _derived_keys.pop(cache_key, None)
+
+
 def unlock_all(password: str, aliases: list[str]) -> list[str]:
     """Unlock every alias in *aliases* using *password*.
 
@@ -204,12 +372,14 @@ def unlock_all(password: str, aliases: list[str]) -> list[str]:
 def lock(alias: str) -> None:
     """Explicitly lock the session for *alias*."""
     _session_passwords.pop(alias, None)
+    _forget_derived_key(alias)
     _clear_session(alias)
 
 
 def logout(alias: str) -> None:
     """Remove all stored credentials for *alias*."""
     _session_passwords.pop(alias, None)
+    _forget_derived_key(alias)
     _clear_session(alias)
     try:
         keyring.delete_password(KEYRING_SERVICE_ENCRYPTED, alias)
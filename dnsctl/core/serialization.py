@@ -0,0 +1,55 @@
+"""JSON (de)serialization — uses ``orjson`` when installed, stdlib otherwise.
+
+``orjson`` is an optional speed-up (``pip install dnsctl-app[fast]``).
+Both back-ends produce the same document layout, so files written by one
+are read back unchanged by the other.
+"""
+
+import io
+import json
+from typing import IO, Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse a JSON document from *data* (``bytes`` or ``str``)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, *, indent: bool = False) -> bytes:
+    """Serialize *obj* to UTF-8 JSON bytes.
+
+    With *indent*, output matches ``json.dumps(obj, indent=2)``; otherwise
+    it is compact with no whitespace.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def dump(obj: Any, fp: IO[bytes], *, indent: bool = False) -> None:
+    """Serialize *obj* into the binary file *fp*; output equals :func:`dumps`.
+
+    The stdlib back-end streams the document in pieces instead of building
+    the whole string first, which keeps peak memory low for large zones.
+    """
+    if orjson is not None:
+        fp.write(dumps(obj, indent=indent))
+        return
+    text = io.TextIOWrapper(fp, encoding="utf-8", newline="")
+    try:
+        if indent:
+            json.dump(obj, text, indent=2, ensure_ascii=False)
+        else:
+            json.dump(obj, text, separators=(",", ":"), ensure_ascii=False)
+        text.flush()
+    finally:
+        text.detach()
@@ -18,9 +18,11 @@ import json
 import os
 import re
 import shutil
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, Iterator
 
 from dnsctl.config import (
     ACCOUNTS_DIR,
@@ -28,11 +30,13 @@ from dnsctl.config import (
     LOGS_DIR,
     METADATA_FILE,
     CONFIG_FILE,
+    IMPORT_MAX_BYTES,
     STATE_DIR,
     _LEGACY_ZONES_DIR,
     KEYRING_SERVICE_ENCRYPTED,
     KEYRING_SERVICE_SESSION,
 )
+from dnsctl.core import serialization
 
 
 # ------------------------------------------------------------------
@@ -48,6 +52,36 @@ def slugify(label: str) -> str:
     return slug or "account"
 
 
+@contextmanager
+def _atomic_open(path: Path) -> Iterator[IO[bytes]]:
+    """Open a temp file for writing that replaces *path* on success.
+
+    Readers see either the old file or the new one, never a truncated
+    file left behind by a crash or Ctrl-C mid-write.  Each writer gets its
+    own temp file, so concurrent saves of one file never share one.
+    """
+    fh = tempfile.NamedTemporaryFile(
+        "wb", dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False,
+    )
+    tmp = Path(fh.name)
+    try:
+        with fh:
+            yield fh
+            # The data must be on disk before the rename publishes it
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _atomic_dump(path: Path, obj: Any) -> None:
+    """Atomically write *obj* to *path* as indented JSON."""
+    with _atomic_open(path) as fh:
+        serialization.dump(obj, fh, indent=True)
+
+
 # ------------------------------------------------------------------
 # Initialisation
 # ------------------------------------------------------------------
@@ -62,11 +96,11 @@ def init_state_dir() -> Path:
 
     # Ensure metadata.json exists
     if not METADATA_FILE.exists():
-        METADATA_FILE.write_text(json.dumps({"protected_records": []}, indent=2))
+        _atomic_dump(METADATA_FILE, {"protected_records": []})
 
     # Ensure config.json exists
     if not CONFIG_FILE.exists():
-        CONFIG_FILE.write_text(json.dumps({}, indent=2))
+        _atomic_dump(CONFIG_FILE, {})
 
     # Migrate from legacy single-account layout (idempotent)
     _migrate_legacy()
@@ -142,7 +176,7 @@ def _migrate_legacy() -> None:
     if has_data:
         accounts = [{"alias": "default", "label": "Default"}]
 
-    ACCOUNTS_FILE.write_text(json.dumps(accounts, indent=2), encoding="utf-8")
+    _atomic_dump(ACCOUNTS_FILE, accounts)
 
     # Update config.json: rename default_zone → default_zone_default, set default_account
     cfg = get_config()
@@ -154,7 +188,7 @@ def _migrate_legacy() -> None:
             new_cfg[k] = v
     if has_data:
         new_cfg["default_account"] = "default"
-    CONFIG_FILE.write_text(json.dumps(new_cfg, indent=2), encoding="utf-8")
+    _atomic_dump(CONFIG_FILE, new_cfg)
 
 
 # ------------------------------------------------------------------
@@ -169,7 +203,7 @@ def list_accounts() -> list[dict]:
     if not ACCOUNTS_FILE.exists():
         return []
     try:
-        return json.loads(ACCOUNTS_FILE.read_text(encoding="utf-8"))
+        return serialization.loads(ACCOUNTS_FILE.read_bytes())
     except (json.JSONDecodeError, OSError):
         return []
 
@@ -191,7 +225,7 @@ def add_account(alias: str, label: str) -> dict:
     accounts = list_accounts()
     if not any(a["alias"] == alias for a in accounts):
         accounts.append({"alias": alias, "label": label})
-        ACCOUNTS_FILE.write_text(json.dumps(accounts, indent=2), encoding="utf-8")
+        _atomic_dump(ACCOUNTS_FILE, accounts)
 
     return {"alias": alias, "label": label}
 
@@ -209,11 +243,15 @@ def remove_account(alias: str) -> None:
         func(path)
 
     account_dir = ACCOUNTS_DIR / alias
+    # Close the shared repo first: its git processes hold files open, and a
+    # re-added alias must not reuse it
+    from dnsctl.core.git_manager import forget_git_manager
+    forget_git_manager(account_dir)
     if account_dir.exists():
         shutil.rmtree(account_dir, onexc=_force_remove)
 
     accounts = [a for a in list_accounts() if a["alias"] != alias]
-    ACCOUNTS_FILE.write_text(json.dumps(accounts, indent=2), encoding="utf-8")
+    _atomic_dump(ACCOUNTS_FILE, accounts)
 
     # Clean up per-account config keys
     cfg = get_config()
@@ -222,7 +260,7 @@ def remove_account(alias: str) -> None:
         del cfg[k]
     if cfg.get("default_account") == alias:
         del cfg["default_account"]
-    CONFIG_FILE.write_text(json.dumps(cfg, indent=2), encoding="utf-8")
+    _atomic_dump(CONFIG_FILE, cfg)
 
 
 def get_current_account() -> str | None:
@@ -253,75 +291,258 @@ def _zone_path(zone_name: str, alias: str) -> Path:
     return get_account_zones_dir(alias) / f"{zone_name}.json"
 
 
+def _file_sig(st: os.stat_result) -> tuple[int, int, int, int]:
+    """Identify one version of a file for the parse caches below.
+
+    Every write here goes through os.replace, so the inode changes even
+    when a rewrite keeps the size and lands in the same mtime tick.
+    """
+    return (st.st_ino, st.st_mtime_ns, st.st_ctime_ns, st.st_size)
+
+
+# Everything but the records of the zone files read or written by this
+# process, keyed by path and validated against _file_sig.  Lets save_zone
+# decide whether a rewrite is needed without re-parsing the file.
+_zone_headers: dict[Path, tuple[tuple[int, int, int, int], dict]] = {}
+
+
+def _remember_header(path: Path, state: dict) -> None:
+    st = path.stat()
+    header = {k: v for k, v in state.items() if k != "records"}
+    _zone_headers[path] = (_file_sig(st), header)
+
+
+# _write_zone_file ends the first line with this, right after the header
+_RECORDS_OPEN = b',"records":['
+
+
+def _read_header(path: Path) -> dict:
+    """Parse only the header of the zone file at *path*.
+
+    Files from ``_write_zone_file`` hold the whole header on their first
+    line; anything else (older indented files, empty zones) is parsed whole.
+    """
+    with path.open("rb") as fh:
+        first = fh.readline()
+        head = first.rstrip(b"\r\n")
+        if head.endswith(_RECORDS_OPEN):
+            return serialization.loads(head[:-len(_RECORDS_OPEN)] + b"}")
+        state = serialization.loads(first + fh.read())
+    state.pop("records", None)
+    return state
+
+
+def _load_header(path: Path) -> dict | None:
+    """Return the cached header for *path*, reading the file on a miss."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    cached = _zone_headers.get(path)
+    if cached is None or cached[0] != _file_sig(st):
+        cached = _zone_headers[path] = (_file_sig(st), _read_header(path))
+    return cached[1]
+
+
+def load_zone_header(zone_name: str, alias: str) -> dict | None:
+    """Return a synced zone's state without its records, or ``None``.
+
+    Much cheaper than ``load_zone`` on large zones — only the first line
+    of the file is parsed.
+    """
+    header = _load_header(_zone_path(zone_name, alias))
+    return dict(header) if header is not None else None
+
+
 def load_zone(zone_name: str, alias: str) -> dict | None:
     """Load zone state from disk for *alias*.  Returns ``None`` if not synced yet."""
     path = _zone_path(zone_name, alias)
     if not path.exists():
         return None
-    return json.loads(path.read_text(encoding="utf-8"))
+    state = serialization.loads(path.read_bytes())
+    _remember_header(path, state)
+    return state
 
 
-def save_zone(zone_id: str, zone_name: str, records: list[dict], alias: str) -> dict:
+def load_all_zones(alias: str) -> dict[str, dict]:
+    """Load every synced zone for *alias* in one directory scan.
+
+    Returns ``{zone_name: state}`` ordered by zone name — equivalent to
+    calling ``load_zone`` for each name from ``list_synced_zones`` but
+    without a separate ``exists()`` check and path build per zone.
+    """
+    zones_dir = get_account_zones_dir(alias)
+    try:
+        entries = [e for e in os.scandir(zones_dir)
+                   if e.name.endswith(".json") and e.is_file()]
+    except FileNotFoundError:
+        return {}
+    entries.sort(key=lambda e: e.name)
+    states: dict[str, dict] = {}
+    for entry in entries:
+        with open(entry.path, "rb") as f:
+            states[entry.name[:-len(".json")]] = serialization.loads(f.read())
+    return states
+
+
+def save_zone(
+    zone_id: str,
+    zone_name: str,
+    records: list[dict],
+    alias: str,
+    *,
+    remote_marker: str | None = None,
+) -> dict:
     """Persist zone state to ``~/.dnsctl/accounts/<alias>/zones/<name>.json``.
 
     If the records haven't changed since the last save (same hash),
     the file is **not** rewritten so git sees no diff.
 
+    *remote_marker* is the ``CloudflareClient.records_marker`` taken before
+    the records were fetched; it is only passed by ``sync --skip-unchanged``
+    and lets later runs avoid refetching.  Saves without it that change the
+    records (local edits) drop the marker.
+
     Returns the saved state dict (including computed hash).
     """
-    new_hash = _compute_hash(records)
+    path = _zone_path(zone_name, alias)
+    existing = _load_header(path)
+    stored_hash = existing.get("state_hash") if existing else None
+
+    # Zone files written before the switch to BLAKE2b carry a 64-char
+    # SHA-256 digest; compare those the old way (in the same pass) so
+    # upgrading doesn't rewrite and re-commit every unchanged zone.
+    hasher = _new_hasher()
+    legacy = hashlib.sha256() if stored_hash and len(stored_hash) == 64 else None
+    _feed_canonical(records, *(h for h in (hasher, legacy) if h is not None))
+    new_hash = hasher.hexdigest()
+    current = legacy.hexdigest() if legacy is not None else new_hash
 
     # Skip rewrite if records are identical (avoids timestamp-only diffs)
-    existing = load_zone(zone_name, alias)
-    if existing and existing.get("state_hash") == new_hash:
-        return existing
+    if (stored_hash == current
+            and (remote_marker is None or existing.get("remote_marker") == remote_marker)):
+        return dict(existing, records=records)
 
     state = {
         "zone_id": zone_id,
         "zone_name": zone_name,
         "records": records,
         "last_synced_at": datetime.now(timezone.utc).isoformat(),
-        "state_hash": _compute_hash(records),
+        "state_hash": new_hash,
     }
-    path = _zone_path(zone_name, alias)
+    if remote_marker is not None:
+        state["remote_marker"] = remote_marker
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    _write_zone_file(path, state)
+    _remember_header(path, state)
     return state
 
 
+def _write_zone_file(path: Path, state: dict) -> None:
+    """Write zone *state* with the header first and one record per line.
+
+    Compact records keep the file about a third smaller than ``indent=2``
+    and cheaper to encode, while a changed record is still a one-line
+    git diff.  Any JSON reader loads it as before.
+    """
+    header = serialization.dumps({k: v for k, v in state.items() if k != "records"})
+    records = state["records"]
+    with _atomic_open(path) as fh:
+        fh.write(header[:-1] + b',"records":[')
+        if records:
+            fh.write(b"\n")
+            fh.write(b",\n".join(serialization.dumps(r) for r in records))
+            fh.write(b"\n")
+        fh.write(b"]}\n")
+
+
 def list_synced_zones(alias: str) -> list[str]:
     """Return a list of zone names synced locally for *alias*."""
-    zones_dir = get_account_zones_dir(alias)
-    if not zones_dir.exists():
+    # scandir answers is_file() from the directory entry — no Path objects
+    # or extra stat() per file as with glob()
+    try:
+        with os.scandir(get_account_zones_dir(alias)) as it:
+            return sorted(e.name[:-len(".json")] for e in it
+                          if e.name.endswith(".json") and e.is_file())
+    except FileNotFoundError:
         return []
-    return sorted(p.stem for p in zones_dir.glob("*.json"))
 
 
 # ------------------------------------------------------------------
 # Config helpers
 # ------------------------------------------------------------------
 
+# Last parsed config, keyed by path and validated against _file_sig like
+# _zone_headers, so repeated lookups in one command parse it once.
+_config_cache: tuple[Path, tuple[int, int, int, int], dict] | None = None
+
+
 def get_config() -> dict[str, Any]:
-    if not CONFIG_FILE.exists():
+    global _config_cache
+    try:
+        st = CONFIG_FILE.stat()
+    except FileNotFoundError:
         return {}
-    return json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
+    sig = _file_sig(st)
+    if _config_cache is None or _config_cache[:2] != (CONFIG_FILE, sig):
+        _config_cache = (CONFIG_FILE, sig, serialization.loads(CONFIG_FILE.read_bytes()))
+    # Shallow copy — callers (set_config among them) mutate the result
+    return dict(_config_cache[2])
 
 
 def set_config(key: str, value: Any) -> None:
+    global _config_cache
     cfg = get_config()
     cfg[key] = value
-    CONFIG_FILE.write_text(json.dumps(cfg, indent=2), encoding="utf-8")
+    _atomic_dump(CONFIG_FILE, cfg)
+    _config_cache = (CONFIG_FILE, _file_sig(CONFIG_FILE.stat()), cfg)
 
 
 # ------------------------------------------------------------------
 # Hashing
 # ------------------------------------------------------------------
 
-def _compute_hash(records: list[dict]) -> str:
-    """Deterministic SHA-256 hash of the records list."""
+_CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+# Records encoded per hasher update — keeps the working buffer small
+# without paying per-record encoder overhead
+_HASH_CHUNK = 512
+
+
+def _feed_canonical(records: list[dict], *hashers: Any) -> None:
+    """Feed the canonical JSON of *records* into each of *hashers*.
+
+    The byte stream is identical to ``json.dumps(sorted_records,
+    sort_keys=True, separators=(",", ":"))`` but is produced in chunks, so
+    the whole document is never held in memory at once.
+    """
     sorted_records = sorted(records, key=lambda r: (r.get("type", ""), r.get("name", ""), r.get("content", "")))
-    canonical = json.dumps(sorted_records, sort_keys=True, separators=(",", ":"))
-    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    updates = [h.update for h in hashers]
+    sep = b"["
+    for i in range(0, len(sorted_records), _HASH_CHUNK):
+        # Encode a slice as a list and drop its brackets
+        chunk = _CANONICAL_ENCODER.encode(sorted_records[i:i + _HASH_CHUNK])[1:-1].encode("utf-8")
+        for update in updates:
+            update(sep)
+            update(chunk)
+        sep = b","
+    tail = b"]" if sorted_records else b"[]"
+    for update in updates:
+        update(tail)
+
+
+def _new_hasher() -> Any:
+    return hashlib.blake2b(digest_size=16)
+
+
+def _compute_hash(records: list[dict]) -> str:
+    """Deterministic BLAKE2b-128 hash of the records list.
+
+    Only used for change detection (git provides integrity), so a fast
+    128-bit digest is plenty.
+    """
+    hasher = _new_hasher()
+    _feed_canonical(records, hasher)
+    return hasher.hexdigest()
 
 
 # ------------------------------------------------------------------
@@ -337,7 +558,10 @@ def export_zone(zone_name: str, dest: Path, alias: str) -> Path:
     state = load_zone(zone_name, alias)
     if state is None:
         raise FileNotFoundError(f"Zone '{zone_name}' has not been synced yet.")
-    dest.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    # A plain write, not _atomic_dump: *dest* is the user's file, so it
+    # keeps its mode, owner and any symlink instead of being replaced
+    with dest.open("wb") as fh:
+        serialization.dump(state, fh, indent=True)
     return dest
 
 
@@ -350,9 +574,21 @@ def import_zone(src: Path, alias: str) -> dict:
     Raises ``ValueError`` for invalid files.
     """
     try:
-        data = json.loads(src.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError) as exc:
+        size = src.stat().st_size
+    except OSError as exc:
         raise ValueError(f"Cannot read import file: {exc}") from exc
+    if size > IMPORT_MAX_BYTES:
+        raise ValueError(
+            f"Import file is {size // (1024 * 1024)} MiB; "
+            f"the limit is {IMPORT_MAX_BYTES // (1024 * 1024)} MiB."
+        )
+    try:
+        data = serialization.loads(src.read_bytes())
+    except (ValueError, OSError) as exc:
+        raise ValueError(f"Cannot read import file: {exc}") from exc
+
+    if not isinstance(data, dict):
+        raise ValueError("Import file must contain a JSON object.")
 
     zone_id = data.get("zone_id")
     zone_name = data.get("zone_name")
@@ -372,15 +608,32 @@ def import_zone(src: Path, alias: str) -> dict:
 # Protected records management
 # ------------------------------------------------------------------
 
+# Last parsed metadata, validated against _file_sig like _config_cache:
+# the record tables re-read the protected list on every refresh.
+_metadata_cache: tuple[Path, tuple[int, int, int, int], dict] | None = None
+
+
+def _read_metadata() -> dict:
+    """Return the parsed metadata.json (``{}`` if missing or unreadable)."""
+    global _metadata_cache
+    try:
+        st = METADATA_FILE.stat()
+    except FileNotFoundError:
+        return {}
+    sig = _file_sig(st)
+    if _metadata_cache is None or _metadata_cache[:2] != (METADATA_FILE, sig):
+        try:
+            data = serialization.loads(METADATA_FILE.read_bytes())
+        except (json.JSONDecodeError, OSError):
+            return {}
+        _metadata_cache = (METADATA_FILE, sig, data)
+    return _metadata_cache[2]
+
+
 def load_protected_records() -> list[dict]:
     """Return the list of user-defined protected records from metadata.json."""
-    if not METADATA_FILE.exists():
-        return []
-    try:
-        data = json.loads(METADATA_FILE.read_text(encoding="utf-8"))
-        return data.get("protected_records", [])
-    except (json.JSONDecodeError, OSError):
-        return []
+    # A new list, so callers can append/filter without touching the cache
+    return list(_read_metadata().get("protected_records", []))
 
 
 def add_protected_record(rtype: str, name: str, reason: str = "") -> list[dict]:
@@ -406,11 +659,7 @@ def remove_protected_record(rtype: str, name: str) -> list[dict]:
 
 def _save_metadata(protected: list[dict]) -> None:
     """Write the protected records list back to metadata.json."""
-    data: dict = {}
-    if METADATA_FILE.exists():
-        try:
-            data = json.loads(METADATA_FILE.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, OSError):
-            data = {}
-    data["protected_records"] = protected
-    METADATA_FILE.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    global _metadata_cache
+    data = dict(_read_metadata(), protected_records=list(protected))
+    _atomic_dump(METADATA_FILE, data)
+    _metadata_cache = (METADATA_FILE, _file_sig(METADATA_FILE.stat()), data)
@@ -1,13 +1,20 @@
 """Sync engine — orchestrate plan generation and application."""
 
 import logging
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 
-from dnsctl.core.cloudflare_client import CloudflareClient, CloudflareAPIError
-from dnsctl.core.diff_engine import DiffResult, compute_diff, is_protected
-from dnsctl.core.git_manager import GitManager
+from dnsctl.core.cloudflare_client import CloudflareAPIError, get_client
+from dnsctl.core.diff_engine import (
+    DiffResult, compute_diff, is_protected, record_key, records_equal,
+)
+from dnsctl.core.git_manager import get_git_manager
 from dnsctl.core.state_manager import load_protected_records, load_zone, save_zone
-from dnsctl.config import ACCOUNTS_DIR
+from dnsctl.config import (
+    ACCOUNTS_DIR, APPLY_BATCH_MAX, APPLY_MAX_WORKERS, PLAN_SNAPSHOT_MAX_AGE_SECONDS,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +23,13 @@ logger = logging.getLogger(__name__)
 # Data structures
 # ------------------------------------------------------------------
 
+# Plan.summary wording per action kind, in display order
+_SUMMARY_FORMATS = (
+    ("create", "+{} create"),
+    ("update", "~{} update"),
+    ("delete", "-{} delete"),
+)
+
 @dataclass
 class PlanAction:
     """A single action in an execution plan."""
@@ -35,6 +49,10 @@ class Plan:
     zone_id: str
     actions: list[PlanAction] = field(default_factory=list)
     drift: DiffResult | None = None
+    # Remote records the plan was computed against (None if not fetched)
+    remote: list[dict] | None = field(default=None, repr=False)
+    # time.monotonic() when the plan (and its snapshot) was made
+    created_at: float = field(default_factory=time.monotonic, repr=False)
 
     @property
     def has_changes(self) -> bool:
@@ -44,18 +62,14 @@ class Plan:
     def has_protected(self) -> bool:
         return any(a.protected for a in self.actions)
 
+    @property
+    def protected_count(self) -> int:
+        return sum(1 for a in self.actions if a.protected)
+
     @property
     def summary(self) -> str:
-        creates = sum(1 for a in self.actions if a.action == "create")
-        updates = sum(1 for a in self.actions if a.action == "update")
-        deletes = sum(1 for a in self.actions if a.action == "delete")
-        parts = []
-        if creates:
-            parts.append(f"+{creates} create")
-        if updates:
-            parts.append(f"~{updates} update")
-        if deletes:
-            parts.append(f"-{deletes} delete")
+        counts = Counter(a.action for a in self.actions)
+        parts = [fmt.format(counts[kind]) for kind, fmt in _SUMMARY_FORMATS if counts[kind]]
         return ", ".join(parts) if parts else "No changes"
 
 
@@ -82,8 +96,8 @@ class SyncEngine:
 
     def __init__(self, alias: str) -> None:
         self._alias = alias
-        self._cf = CloudflareClient()
-        self._git = GitManager(ACCOUNTS_DIR / alias)
+        self._cf = get_client()
+        self._git = get_git_manager(ACCOUNTS_DIR / alias)
 
     # ------------------------------------------------------------------
     # Drift detection
@@ -128,11 +142,12 @@ class SyncEngine:
         # Drift: what changed on remote since our last sync
         drift = compute_diff(local_records, remote_records)
 
-        # Plan diff: base=remote, target=local
+        # Plan diff: base=remote, target=local — the same pairing read the
+        # other way round, so it is derived from the drift instead of rematched
         #   added   → in local, not remote → CREATE
         #   removed → in remote, not local → DELETE
         #   modified → both have it, before=remote, after=local → UPDATE
-        diff = compute_diff(remote_records, local_records)
+        diff = drift.reversed()
 
         user_protected = load_protected_records()
         actions: list[PlanAction] = []
@@ -165,6 +180,7 @@ class SyncEngine:
             zone_id=zone_id,
             actions=actions,
             drift=drift,
+            remote=remote_records,
         )
 
     # ------------------------------------------------------------------
@@ -177,51 +193,70 @@ class SyncEngine:
         """Execute a plan against the Cloudflare API.
 
         Protected records are skipped unless *force* is ``True``.
-        After application, re-syncs state from remote and commits to git.
+        Several actions are sent as one atomic batch request; if that is
+        rejected, or the plan is too large for one batch, records are written
+        one call each, with independent record names written concurrently.
+        Results keep plan order.  After application, re-syncs state from
+        remote and commits to git.
         """
         result = ApplyResult()
+        runnable = [
+            i for i, action in enumerate(plan.actions)
+            if force or not action.protected
+        ]
+
+        errors: dict[int, str | None] = {}
+        written: dict[int, dict | None] = {}
+
+        outcome = None
+        if 1 < len(runnable) <= APPLY_BATCH_MAX:
+            outcome = self._apply_batch(plan, runnable, token)
+        if outcome is not None:
+            for i, (rec, err) in outcome.items():
+                written[i], errors[i] = rec, err
+        elif runnable:
+            # Actions on the same record name run in plan order (a CNAME
+            # can't coexist with other types at a name); different names are
+            # independent and their API calls are overlapped.
+            groups: dict[str, list[int]] = {}
+            for i in runnable:
+                groups.setdefault(plan.actions[i].record.get("name", ""), []).append(i)
+
+            def run_group(indices: list[int]) -> None:
+                for i in indices:
+                    written[i], errors[i] = self._apply_action(
+                        plan.actions[i], plan.zone_id, token,
+                    )
 
-        for action in plan.actions:
-            if action.protected and not force:
+            workers = min(APPLY_MAX_WORKERS, len(groups))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(run_group, groups.values()))
+
+        for i, action in enumerate(plan.actions):
+            if i not in errors:
                 result.failed.append((
                     action,
                     f"Protected ({action.protection_reason}). Use --force to override.",
                 ))
-                continue
-
-            try:
-                if action.action == "create":
-                    self._cf.create_record(token, plan.zone_id, action.record)
-                    result.succeeded.append(action)
-
-                elif action.action == "update":
-                    record_id = (action.before or action.record).get("id")
-                    if not record_id:
-                        result.failed.append((action, "No record ID for update"))
-                        continue
-                    self._cf.update_record(
-                        token, plan.zone_id, record_id, action.record,
-                    )
-                    result.succeeded.append(action)
-
-                elif action.action == "delete":
-                    record_id = action.record.get("id")
-                    if not record_id:
-                        result.failed.append((action, "No record ID for delete"))
-                        continue
-                    self._cf.delete_record(token, plan.zone_id, record_id)
-                    result.succeeded.append(action)
-
-            except CloudflareAPIError as exc:
-                logger.error("Failed to %s record: %s", action.action, exc)
-                result.failed.append((action, str(exc)))
-            except Exception as exc:
-                logger.error("Unexpected error during %s: %s", action.action, exc)
-                result.failed.append((action, str(exc)))
-
-        # Re-sync: fetch fresh remote state and save locally
+            elif errors[i] is None:
+                result.succeeded.append(action)
+            else:
+                result.failed.append((action, errors[i]))
+
+        # Re-sync and save locally.  When every call succeeded on a fresh
+        # plan the new remote state is its snapshot with our writes applied.
+        # After a failure we can't be sure what landed, and a plan left open
+        # for a while may have missed other edits on Cloudflare, so fetch it
+        # again in those cases.
+        snapshot_fresh = (
+            plan.remote is not None
+            and time.monotonic() - plan.created_at <= PLAN_SNAPSHOT_MAX_AGE_SECONDS
+        )
         try:
-            remote_records = self._cf.list_records(token, plan.zone_id)
+            if snapshot_fresh and not any(errors.values()):
+                remote_records = _apply_to_snapshot(plan, written)
+            else:
+                remote_records = self._cf.list_records(token, plan.zone_id)
             save_zone(plan.zone_id, plan.zone_name, remote_records, self._alias)
 
             self._git.auto_init()
@@ -234,6 +269,166 @@ class SyncEngine:
 
         return result
 
+    def _apply_batch(
+        self, plan: Plan, indices: list[int], token: str,
+    ) -> dict[int, tuple[dict | None, str | None]] | None:
+        """Send the actions at *indices* as one batch request.
+
+        Returns ``{index: (record, error)}`` like :meth:`_apply_action`, or
+        ``None`` if Cloudflare rejected the batch outright — it is atomic, so
+        nothing was applied and the caller can fall back to per-record calls.
+
+        Any other failure (transport error, timeout, 429 or 5xx) leaves the
+        outcome unknown: re-sending the writes could duplicate records, so
+        every action is reported failed and the caller re-fetches the zone.
+        """
+        outcome: dict[int, tuple[dict | None, str | None]] = {}
+        posts: list[int] = []
+        puts: list[tuple[int, str]] = []
+        deletes: list[tuple[int, str]] = []
+        for i in indices:
+            action = plan.actions[i]
+            if action.action == "create":
+                posts.append(i)
+            elif action.action == "update":
+                record_id = (action.before or action.record).get("id")
+                if record_id:
+                    puts.append((i, record_id))
+                else:
+                    outcome[i] = (None, "No record ID for update")
+            elif action.action == "delete":
+                record_id = action.record.get("id")
+                if record_id:
+                    deletes.append((i, record_id))
+                else:
+                    outcome[i] = (None, "No record ID for delete")
+            else:
+                outcome[i] = (None, None)
+
+        try:
+            written = self._cf.batch_records(
+                token, plan.zone_id,
+                posts=[plan.actions[i].record for i in posts],
+                puts=[(rid, plan.actions[i].record) for i, rid in puts],
+                deletes=[rid for _, rid in deletes],
+            )
+        except Exception as exc:
+            if _is_rejection(exc):
+                logger.warning("Batch apply rejected, writing records one by one: %s", exc)
+                return None
+            logger.error("Batch apply outcome unknown: %s", exc)
+            for i in posts + [i for i, _ in puts] + [i for i, _ in deletes]:
+                outcome[i] = (None, f"Batch outcome unknown: {exc}")
+            return outcome
+
+        for i, _ in deletes:
+            outcome[i] = (None, None)
+        # Responses are in request order.  If one comes back short the batch
+        # was still applied, so the entries can't be paired up by position;
+        # look the records up in the zone instead.
+        put_indices = [i for i, _ in puts]
+        if len(written["posts"]) == len(posts) and len(written["puts"]) == len(puts):
+            for i, rec in zip(posts, written["posts"]):
+                outcome[i] = (rec, None)
+            for i, rec in zip(put_indices, written["puts"]):
+                outcome[i] = (rec, None)
+        else:
+            logger.warning("Batch response incomplete, checking the zone")
+            outcome.update(self._reconcile(plan, posts, put_indices, token))
+        return outcome
+
+    def _reconcile(
+        self, plan: Plan, posts: list[int], puts: list[int], token: str,
+    ) -> dict[int, tuple[dict | None, str | None]]:
+        """Find what the creates at *posts* and updates at *puts* became.
+
+        Re-reads the zone: an update landed if its record now matches the
+        desired one; a create landed if a record with its key appeared that
+        was not in the plan's snapshot.
+        """
+        try:
+            remote = self._cf.list_records(token, plan.zone_id)
+        except Exception as exc:
+            return {i: (None, f"Could not confirm batch result: {exc}") for i in posts + puts}
+
+        outcome: dict[int, tuple[dict | None, str | None]] = {}
+        by_id = {r.get("id"): r for r in remote}
+        for i in puts:
+            action = plan.actions[i]
+            rec = by_id.get((action.before or action.record).get("id"))
+            if rec is not None and records_equal(rec, action.record):
+                outcome[i] = (rec, None)
+            else:
+                outcome[i] = (None, "Update not found in zone after batch")
+
+        known = {r.get("id") for r in plan.remote or []}
+        created: dict[tuple, list[dict]] = {}
+        for r in remote:
+            if r.get("id") not in known:
+                created.setdefault(record_key(r), []).append(r)
+        for i in posts:
+            matches = created.get(record_key(plan.actions[i].record))
+            if matches:
+                outcome[i] = (matches.pop(0), None)
+            else:
+                outcome[i] = (None, "Create not found in zone after batch")
+        return outcome
+
+    def _apply_action(
+        self, action: PlanAction, zone_id: str, token: str,
+    ) -> tuple[dict | None, str | None]:
+        """Send one plan action to Cloudflare.
+
+        Returns ``(record, error)``: the record as Cloudflare now stores it
+        (``None`` for deletes and failures) and an error message or ``None``.
+        """
+        try:
+            if action.action == "create":
+                return self._cf.create_record(token, zone_id, action.record), None
+
+            elif action.action == "update":
+                record_id = (action.before or action.record).get("id")
+                if not record_id:
+                    return None, "No record ID for update"
+                return self._cf.update_record(token, zone_id, record_id, action.record), None
+
+            elif action.action == "delete":
+                record_id = action.record.get("id")
+                if not record_id:
+                    return None, "No record ID for delete"
+                self._cf.delete_record(token, zone_id, record_id)
+
+        except CloudflareAPIError as exc:
+            logger.error("Failed to %s record: %s", action.action, exc)
+            return None, str(exc)
+        except Exception as exc:
+            logger.error("Unexpected error during %s: %s", action.action, exc)
+            return None, str(exc)
+        return None, None
+
+
+def _is_rejection(exc: Exception) -> bool:
+    """True if *exc* is Cloudflare refusing a request, proving nothing was written.
+
+    Only a 4xx other than 429 says so; transport failures (status 0),
+    exhausted rate-limit retries and 5xx responses leave the outcome unknown.
+    """
+    return (isinstance(exc, CloudflareAPIError)
+            and 400 <= exc.status_code < 500 and exc.status_code != 429)
+
+
+def _apply_to_snapshot(plan: Plan, written: dict[int, dict | None]) -> list[dict]:
+    """Return ``plan.remote`` with the successful actions in *written* applied."""
+    by_id = {r["id"]: r for r in plan.remote or []}
+    for i, rec in written.items():
+        action = plan.actions[i]
+        if action.action == "delete":
+            by_id.pop(action.record.get("id"), None)
+        else:
+            # An update keeps its ID, so it replaces the record in place
+            by_id[rec["id"]] = rec
+    return list(by_id.values())
+
 
 # ---------------------------------------------------------------------------
 # Commit message helpers
@@ -1,6 +1,6 @@
 """DNS record validation — shared by CLI and GUI."""
 
-import ipaddress
+import socket
 
 from dnsctl.config import SUPPORTED_RECORD_TYPES
 
@@ -20,20 +20,20 @@ def validate_record(record: dict) -> str | None:
     if not content:
         return "Content is required."
 
-    if rtype == "A":
-        try:
-            addr = ipaddress.ip_address(content)
-            if not isinstance(addr, ipaddress.IPv4Address):
-                return "A record content must be a valid IPv4 address."
-        except ValueError:
-            return "A record content must be a valid IPv4 address."
-
-    if rtype == "AAAA":
-        try:
-            addr = ipaddress.ip_address(content)
-            if not isinstance(addr, ipaddress.IPv6Address):
-                return "AAAA record content must be a valid IPv6 address."
-        except ValueError:
-            return "AAAA record content must be a valid IPv6 address."
+    # inet_pton is a single C call and, unlike ipaddress, rejects IPv6
+    # scope ids ("fe80::1%eth0"), which have no meaning in DNS.
+    if rtype == "A" and not _is_address(socket.AF_INET, content):
+        return "A record content must be a valid IPv4 address."
+
+    if rtype == "AAAA" and not _is_address(socket.AF_INET6, content):
+        return "AAAA record content must be a valid IPv6 address."
 
     return None
+
+
+def _is_address(family: int, text: str) -> bool:
+    try:
+        socket.inet_pton(family, text)
+    except (OSError, ValueError):
+        return False
+    return True
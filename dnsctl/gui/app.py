@@ -15,8 +15,7 @@ except ImportError:
     )
     sys.exit(1)
 from PyQt6.QtGui import QIcon, QCursor
-from PyQt6.QtWidgets import QApplication
-from PyQt6 import uic
+from PyQt6.QtWidgets import QApplication, QMessageBox
 
 from dnsctl.config import LOG_FILE
 from dnsctl.core.security import get_token, is_logged_in
@@ -29,7 +28,7 @@ from dnsctl.core.state_manager import (
     slugify,
 )
 from dnsctl.gui import theme as _gui_theme
-from dnsctl.gui.controllers.main_controller import MainController
+from dnsctl.gui.ui_loader import load_ui
 
 # Detect if running as PyInstaller bundle
 if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
@@ -54,9 +53,8 @@ class _VerifyWorker(QThread):
 
     def run(self) -> None:
         try:
-            from dnsctl.core.cloudflare_client import CloudflareClient
-            cf = CloudflareClient()
-            cf.verify_token(self._token)
+            from dnsctl.core.cloudflare_client import get_client
+            get_client().verify_token(self._token)
             self.finished.emit(True, "")
         except Exception as exc:
             self.finished.emit(False, str(exc))
@@ -86,8 +84,7 @@ def _set_platform_icon():
 
 def _load_ui(name: str):
     """Load a .ui file from the gui/ui/ directory and return the widget."""
-    path = UI_DIR / name
-    widget = uic.loadUi(str(path))
+    widget = load_ui(UI_DIR / name)
     # Set icon on all windows/dialogs
     if ICON_PATH.exists():
         widget.setWindowIcon(QIcon(str(ICON_PATH)))
@@ -140,7 +137,6 @@ def _show_login_dialog(app: QApplication, alias: str | None = None, reuse_passwo
     _ha(dialog.cancelButton, color=_accent)
 
     def on_help():
-        from PyQt6.QtWidgets import QMessageBox
         msg = QMessageBox(dialog)
         msg.setWindowTitle("Create an API Token")
         msg.setTextFormat(Qt.TextFormat.RichText)
@@ -270,7 +266,6 @@ def _show_unlock_dialog(app: QApplication, alias: str = "default", label: str =
     the login dialog again.
     """
     from dnsctl.core.security import unlock, logout
-    from PyQt6.QtWidgets import QMessageBox
 
     dialog = _load_ui("unlock_dialog.ui")
     _uc = _gui_theme.SEMANTIC_COLORS[_gui_theme.load_theme_pref()]
@@ -407,6 +402,10 @@ def main() -> None:
                 sys.exit(0)
 
     # --- Main window ---
+    # Imported only now: it pulls in the sync engine, git and requests,
+    # none of which the login/unlock dialogs need.
+    from dnsctl.gui.controllers.main_controller import MainController
+
     window = _load_ui("main_window.ui")
     controller = MainController(window, token, alias=alias, theme_mode=_current_theme)
     controller.setup()
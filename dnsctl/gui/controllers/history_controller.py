@@ -1,6 +1,5 @@
 """History dialog controller — browse commits, preview state, rollback."""
 
-import json
 import logging
 from pathlib import Path
 
@@ -10,20 +9,69 @@ from dnsctl.config import LOG_FILE
 def _log_path() -> str:
     return str(LOG_FILE)
 
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
 from PyQt6.QtWidgets import (
     QDialog,
     QFileDialog,
     QHeaderView,
     QMessageBox,
-    QTableWidgetItem,
 )
 
 from dnsctl.config import ACCOUNTS_DIR
-from dnsctl.core.git_manager import GitManager
+from dnsctl.core import serialization
+from dnsctl.core.git_manager import get_git_manager
 from dnsctl.core.state_manager import list_synced_zones
 
 logger = logging.getLogger(__name__)
 
+# Column headers for the commit table
+_COLUMNS = ("Commit", "Date", "Message")
+
+
+class CommitTableModel(QAbstractTableModel):
+    """Table model over ``GitManager.log`` entries; cells are built on demand."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._commits: list[dict] = []
+        self._head_sha: str | None = None
+
+    def set_commits(self, commits: list[dict], head_sha: str | None) -> None:
+        self.beginResetModel()
+        self._commits = commits
+        self._head_sha = head_sha
+        self.endResetModel()
+
+    # -- QAbstractTableModel interface --
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return len(self._commits)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return len(_COLUMNS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return _COLUMNS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        entry = self._commits[index.row()]
+        is_head = entry["sha"] == self._head_sha
+        col = index.column()
+        if col == 0:
+            return entry["short_sha"] + (" [HEAD]" if is_head else "")
+        if col == 1:
+            return entry["date"][:19].replace("T", " ")
+        if col == 2:
+            return entry["message"] + (" ← current" if is_head else "")
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
 
 class HistoryController:
     """Drives the history_dialog.ui — commit list, preview, rollback."""
@@ -31,8 +79,12 @@ class HistoryController:
     def __init__(self, dialog: QDialog, alias: str = "default") -> None:
         self._dialog = dialog
         self._alias = alias
-        self._git = GitManager(ACCOUNTS_DIR / alias)
+        self._git = get_git_manager(ACCOUNTS_DIR / alias)
         self._commits: list[dict] = []
+        self._model = CommitTableModel()
+        # Synced zone names; fixed while the dialog is open except after a
+        # rollback, so not rescanned on every selection change
+        self._zones: list[str] = []
         self.rolled_back = False  # True if a rollback was performed
 
     # ------------------------------------------------------------------
@@ -46,7 +98,12 @@ class HistoryController:
         d.closeButton.clicked.connect(d.accept)
         d.rollbackButton.clicked.connect(self._on_rollback)
         d.exportButton.clicked.connect(self._on_export)
-        d.historyTable.itemSelectionChanged.connect(self._on_selection)
+        d.historyTable.setModel(self._model)
+        d.historyTable.selectionModel().selectionChanged.connect(self._on_selection)
+        header = d.historyTable.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
 
         # Icons and semantic styling for destructive action
         from dnsctl.gui.icons import get_icon
@@ -68,6 +125,7 @@ class HistoryController:
 
         # Load history
         self._git.auto_init()
+        self._zones = list_synced_zones(self._alias)
         self._commits = self._git.log(max_count=100)
         self._populate_table()
 
@@ -76,24 +134,10 @@ class HistoryController:
     # ------------------------------------------------------------------
 
     def _populate_table(self) -> None:
-        table = self._dialog.historyTable
-        table.setRowCount(len(self._commits))
-
+        # The view only asks the model for the rows it shows, so no
+        # per-cell items are built up front.
         head_sha = self._git.repo.head.commit.hexsha if self._commits else None
-
-        for row, entry in enumerate(self._commits):
-            is_head = entry["sha"] == head_sha
-            sha_text = entry["short_sha"] + (" [HEAD]" if is_head else "")
-            msg_text = entry["message"] + (" ← current" if is_head else "")
-            table.setItem(row, 0, QTableWidgetItem(sha_text))
-            table.setItem(row, 1, QTableWidgetItem(entry["date"][:19].replace("T", " ")))
-            table.setItem(row, 2, QTableWidgetItem(msg_text))
-
-        # Stretch the message column
-        header = table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        self._model.set_commits(self._commits, head_sha)
 
     # ------------------------------------------------------------------
     # Selection changed — preview
@@ -119,25 +163,26 @@ class HistoryController:
             return
 
         # Build an HTML preview of zone files at this commit
-        zones = list_synced_zones(self._alias)
         html_parts = [f"<h3>Commit {commit['short_sha']}</h3>"]
         html_parts.append(f"<p><b>{commit['message']}</b><br>{commit['date'][:19]}</p>")
 
         found_any = False
-        for zone_name in zones:
-            rel = f"zones/{zone_name}.json"
-            content = self._git.show_file_at(commit["sha"], rel)
+        contents = self._git.show_files_at(
+            commit["sha"], [f"zones/{z}.json" for z in self._zones]
+        )
+        for zone_name in self._zones:
+            content = contents[f"zones/{zone_name}.json"]
             if content:
                 found_any = True
                 try:
-                    data = json.loads(content)
+                    data = serialization.loads(content)
                     n = len(data.get("records", []))
                     ts = data.get("last_synced_at", "?")[:19]
                     html_parts.append(
                         f"<p><b>{zone_name}</b> — {n} records "
                         f"(synced: {ts})</p>"
                     )
-                except json.JSONDecodeError:
+                except ValueError:
                     html_parts.append(f"<p><b>{zone_name}</b> — (parse error)</p>")
 
         if not found_any:
@@ -207,7 +252,8 @@ class HistoryController:
             f"New commit: {new_sha[:8]}\n\n"
             "Review with Plan, then Apply to update Cloudflare.",
         )
-        # Refresh the history list
+        # Refresh the history list (the rollback may add or remove zones)
+        self._zones = list_synced_zones(self._alias)
         self._commits = self._git.log(max_count=100)
         self._populate_table()
 
@@ -220,8 +266,7 @@ class HistoryController:
         if commit is None:
             return
 
-        zones = list_synced_zones(self._alias)
-        if not zones:
+        if not self._zones:
             QMessageBox.warning(self._dialog, "Export", "No zones synced.")
             return
 
@@ -236,13 +281,15 @@ class HistoryController:
             return
 
         export_data = {}
-        for zone_name in zones:
-            rel = f"zones/{zone_name}.json"
-            content = self._git.show_file_at(commit["sha"], rel)
+        contents = self._git.show_files_at(
+            commit["sha"], [f"zones/{z}.json" for z in self._zones]
+        )
+        for zone_name in self._zones:
+            content = contents[f"zones/{zone_name}.json"]
             if content:
                 try:
-                    export_data[zone_name] = json.loads(content)
-                except json.JSONDecodeError:
+                    export_data[zone_name] = serialization.loads(content)
+                except ValueError:
                     pass
 
         if not export_data:
@@ -252,9 +299,7 @@ class HistoryController:
             )
             return
 
-        Path(dest).write_text(
-            json.dumps(export_data, indent=2), encoding="utf-8"
-        )
+        Path(dest).write_bytes(serialization.dumps(export_data, indent=True))
         QMessageBox.information(
             self._dialog, "Export",
             f"Exported {len(export_data)} zone(s) to:\n{dest}",
@@ -3,16 +3,17 @@
 import logging
 from pathlib import Path
 
-from PyQt6.QtCore import QTimer, QThread, pyqtSignal, Qt
+from PyQt6.QtCore import QFileSystemWatcher, QThreadPool, QTimer, QThread, pyqtSignal, Qt
 from PyQt6.QtGui import QCursor
 from PyQt6.QtWidgets import QApplication, QMainWindow, QMessageBox, QProgressBar
 
 from dnsctl.config import ACCOUNTS_DIR, SESSION_TIMEOUT_SECONDS
-from dnsctl.core.cloudflare_client import CloudflareClient, CloudflareAPIError
-from dnsctl.core.git_manager import GitManager
+from dnsctl.core.cloudflare_client import CloudflareClient, CloudflareAPIError, get_client
+from dnsctl.core.git_manager import GitManager, get_git_manager
 from dnsctl.core.security import get_token, lock
 from dnsctl.core.sync_engine import SyncEngine
 from dnsctl.core.state_manager import (
+    get_account_zones_dir,
     init_state_dir,
     list_synced_zones,
     load_zone,
@@ -31,9 +32,23 @@ from dnsctl.gui.controllers.record_editor_controller import RecordEditorControll
 from dnsctl.gui.controllers.history_controller import HistoryController
 from dnsctl.gui import theme as _theme
 from dnsctl.gui import icons as _icons
+from dnsctl.gui.ui_loader import load_ui
 
 logger = logging.getLogger(__name__)
 
+_UI_DIR = Path(__file__).parent.parent / "ui"
+_RECORD_EDITOR_UI = _UI_DIR / "record_editor.ui"
+_PLAN_DIALOG_UI = _UI_DIR / "plan_dialog.ui"
+_HISTORY_DIALOG_UI = _UI_DIR / "history_dialog.ui"
+
+
+def _commit_pending(git: GitManager) -> None:
+    """Commit *git*'s deferred edits; runs on the commit pool."""
+    try:
+        git.commit_pending()
+    except Exception:
+        logger.exception("Deferred commit failed")
+
 
 class _DriftWorker(QThread):
     """Background worker that detects drift without blocking the UI."""
@@ -78,8 +93,8 @@ class SyncWorker(QThread):
             self._git.auto_init()
 
             zone_counts: list[tuple[str, int]] = []
-            for z in zones:
-                records = self._cf.list_records(self._token, z["id"])
+            fetched = self._cf.iter_records_many(self._token, [z["id"] for z in zones])
+            for z, records in zip(zones, fetched):
                 save_zone(z["id"], z["name"], records, self._alias)
                 zone_counts.append((z["name"], len(records)))
 
@@ -109,8 +124,8 @@ class MainController:
         self._theme_mode = theme_mode
         self._drift_state: str = "unknown"
         self._drift_text: str = "● …"
-        self._cf = CloudflareClient()
-        self._git = GitManager(ACCOUNTS_DIR / alias)
+        self._cf = get_client()
+        self._git = get_git_manager(ACCOUNTS_DIR / alias)
         self._engine = SyncEngine(alias=alias)
         self._record_ctrl: RecordController | None = None
         self._sync_worker: SyncWorker | None = None
@@ -121,6 +136,30 @@ class MainController:
         self._session_timer.setInterval(60_000)
         self._session_timer.timeout.connect(self._check_session)
 
+        # Zone switches are debounced so arrowing through the combo only
+        # loads the zone the user stops on
+        self._zone_load_timer = QTimer()
+        self._zone_load_timer.setSingleShot(True)
+        self._zone_load_timer.setInterval(120)
+        self._zone_load_timer.timeout.connect(self._show_current_zone)
+
+        # Record edits are saved at once but committed together once the
+        # user pauses, so a burst of edits makes one git commit
+        self._commit_timer = QTimer()
+        self._commit_timer.setSingleShot(True)
+        self._commit_timer.setInterval(500)
+        self._commit_timer.timeout.connect(self._commit_in_background)
+        # One thread, so queued commits run in order and off the GUI thread
+        self._commit_pool = QThreadPool()
+        self._commit_pool.setMaxThreadCount(1)
+
+        # Parsed zone files by (alias, zone name).  Writes made here clear it
+        # explicitly; the watcher catches the CLI/TUI editing the same files.
+        self._zone_cache: dict[tuple[str, str], dict] = {}
+        self._zone_watcher = QFileSystemWatcher()
+        self._zone_watcher.directoryChanged.connect(lambda _path: self._zone_cache.clear())
+        self._zone_watcher.fileChanged.connect(lambda _path: self._zone_cache.clear())
+
     # ------------------------------------------------------------------
     # Setup
     # ------------------------------------------------------------------
@@ -169,6 +208,9 @@ class MainController:
         # Start session timer
         self._session_timer.start()
 
+        # Commit any edits still waiting on the commit timer
+        QApplication.instance().aboutToQuit.connect(self._flush_pending_commit)
+
         # Indeterminate progress bar pinned to the right of the status bar
         self._progress = QProgressBar()
         self._progress.setMaximum(0)   # 0 = indeterminate pulsing animation
@@ -238,9 +280,10 @@ class MainController:
                 return
 
         # Switch to the new account
+        self._flush_pending_commit()
         self._alias = new_alias
         self._token = token
-        self._git = GitManager(ACCOUNTS_DIR / new_alias)
+        self._git = get_git_manager(ACCOUNTS_DIR / new_alias)
         self._engine = SyncEngine(alias=new_alias)
         set_current_account(new_alias)
         self._populate_zone_combo()
@@ -268,9 +311,10 @@ class MainController:
         if not token:
             return
         # Switch to the newly added account
+        self._flush_pending_commit()
         self._alias = new_alias
         self._token = token
-        self._git = GitManager(ACCOUNTS_DIR / new_alias)
+        self._git = get_git_manager(ACCOUNTS_DIR / new_alias)
         self._engine = SyncEngine(alias=new_alias)
         set_current_account(new_alias)
         self._populate_account_combo()
@@ -307,6 +351,9 @@ class MainController:
         if answer != QMessageBox.StandardButton.Yes:
             return
 
+        # No background commit may still be writing into the directory
+        # that is about to be deleted
+        self._flush_pending_commit()
         self._session_timer.stop()
         old_alias = self._alias
         sec_logout(old_alias)
@@ -332,7 +379,7 @@ class MainController:
 
         self._alias = new_alias
         self._token = token or ""
-        self._git = GitManager(ACCOUNTS_DIR / new_alias)
+        self._git = get_git_manager(ACCOUNTS_DIR / new_alias)
         self._engine = SyncEngine(alias=new_alias)
         set_current_account(new_alias)
         self._populate_account_combo()
@@ -353,8 +400,7 @@ class MainController:
         w.zoneComboBox.clear()
 
         synced = list_synced_zones(self._alias)
-        for name in synced:
-            w.zoneComboBox.addItem(name)
+        w.zoneComboBox.addItems(synced)
 
         # Select default zone for this account
         cfg = get_config()
@@ -369,15 +415,44 @@ class MainController:
     # ------------------------------------------------------------------
 
     def _on_zone_changed(self, index: int) -> None:
-        if index < 0:
-            return
-        self._load_current_zone()
+        self._zone_load_timer.start()
+
+    def _flush_zone_load(self) -> None:
+        """Load a pending zone switch now, so the table matches the combo."""
+        if self._zone_load_timer.isActive():
+            self._zone_load_timer.stop()
+            self._show_current_zone()
+
+    def _load_zone_cached(self, zone_name: str) -> dict | None:
+        """``load_zone`` for the current account, kept in memory until the file changes."""
+        key = (self._alias, zone_name)
+        state = self._zone_cache.get(key)
+        if state is None:
+            state = load_zone(zone_name, self._alias)
+            if state is None:
+                return None
+            self._zone_cache[key] = state
+            zones_dir = get_account_zones_dir(self._alias)
+            watcher = self._zone_watcher
+            if str(zones_dir) not in watcher.directories():
+                watcher.addPath(str(zones_dir))
+            # Atomic rewrites replace the file, which drops it from the watch
+            # list, so it is re-added on each miss
+            zone_file = str(zones_dir / f"{zone_name}.json")
+            if zone_file not in watcher.files():
+                watcher.addPath(zone_file)
+        return state
 
     def _load_current_zone(self) -> None:
+        """Re-read the selected zone from disk and show it."""
+        self._zone_cache.clear()
+        self._show_current_zone()
+
+    def _show_current_zone(self) -> None:
         zone_name = self._window.zoneComboBox.currentText()
         if not zone_name:
             return
-        state = load_zone(zone_name, self._alias)
+        state = self._load_zone_cached(zone_name)
         if state and self._record_ctrl:
             self._record_ctrl.populate(state.get("records", []))
             ts = state.get("last_synced_at", "never")
@@ -397,6 +472,7 @@ class MainController:
         # Don't start a new sync if one is already running
         if self._sync_worker is not None and self._sync_worker.isRunning():
             return
+        self._flush_pending_commit()
 
         w = self._window
         w.statusbar.showMessage("Syncing…")
@@ -443,12 +519,13 @@ class MainController:
 
     def _current_zone_info(self) -> tuple[str, str] | None:
         """Return (zone_name, zone_id) or None."""
+        self._flush_zone_load()
         zone_name = self._window.zoneComboBox.currentText()
         if not zone_name:
             QMessageBox.warning(self._window, "No Zone",
                                 "No zone selected. Sync first.")
             return None
-        state = load_zone(zone_name, self._alias)
+        state = self._load_zone_cached(zone_name)
         if state is None:
             QMessageBox.warning(self._window, "No Zone",
                                 "Zone not synced. Sync first.")
@@ -462,9 +539,7 @@ class MainController:
             return None, None
         zone_name, _ = info
 
-        from PyQt6 import uic
-        dialog = uic.loadUi(
-            str(Path(__file__).parent.parent / "ui" / "record_editor.ui"))
+        dialog = load_ui(_RECORD_EDITOR_UI)
         ctrl = RecordEditorController(dialog, zone_name, existing)
         ctrl.setup()
         dialog.exec()
@@ -484,6 +559,7 @@ class MainController:
             f"Added {record['type']} {record['name']}")
 
     def _on_edit_record(self) -> None:
+        self._flush_zone_load()
         old = self._record_ctrl.get_selected_record()
         if old is None:
             return
@@ -501,6 +577,7 @@ class MainController:
             f"Updated {updated['type']} {updated['name']}")
 
     def _on_delete_record(self) -> None:
+        self._flush_zone_load()
         rec = self._record_ctrl.get_selected_record()
         if rec is None:
             return
@@ -529,11 +606,26 @@ class MainController:
             return
         zone_name, zone_id = info
         records = self._record_ctrl.records
-        save_zone(zone_id, zone_name, records, self._alias)
-        self._git.auto_init()
-        self._git.commit(message)
+        # Queued before the file is written, so a commit already running on
+        # the pool cannot stage the edit under an earlier message
+        with self._git.deferring(message):
+            save_zone(zone_id, zone_name, records, self._alias)
+        self._zone_cache.clear()
+        self._commit_timer.start()
         self._set_drift_badge("local", "● Local changes")
 
+    def _commit_in_background(self) -> None:
+        git = self._git
+        self._commit_pool.start(lambda: _commit_pending(git))
+
+    def _flush_pending_commit(self) -> None:
+        """Commit record edits still waiting on the commit timer, and wait for it."""
+        if self._commit_timer.isActive():
+            self._commit_timer.stop()
+        self._commit_pool.waitForDone()
+        if self._git.pending_messages():
+            self._git.commit_pending()
+
     def _apply_protect_change(self, record: dict, protect_info: tuple | None) -> None:
         """Apply protection state change if the user toggled it in the editor."""
         if protect_info is None:
@@ -570,10 +662,9 @@ class MainController:
         token = self._ensure_token()
         if token is None:
             return
+        self._flush_pending_commit()
 
-        from PyQt6 import uic
-        dialog = uic.loadUi(
-            str(Path(__file__).parent.parent / "ui" / "plan_dialog.ui"))
+        dialog = load_ui(_PLAN_DIALOG_UI)
         ctrl = PlanController(dialog, zone_name, token, alias=self._alias)
         ctrl.setup()
         dialog.exec()
@@ -606,9 +697,8 @@ class MainController:
 
     def _on_history(self) -> None:
         """Open the history/rollback dialog."""
-        from PyQt6 import uic
-        dialog = uic.loadUi(
-            str(Path(__file__).parent.parent / "ui" / "history_dialog.ui"))
+        self._flush_pending_commit()
+        dialog = load_ui(_HISTORY_DIALOG_UI)
         ctrl = HistoryController(dialog, alias=self._alias)
         ctrl.setup()
         dialog.exec()
@@ -670,6 +760,7 @@ class MainController:
             state = import_zone(Path(path), self._alias)
             zone_name = state["zone_name"]
             n = len(state.get("records", []))
+            self._flush_pending_commit()
             self._git.auto_init()
             from dnsctl.core.commit_messages import import_message
             self._git.commit(import_message(zone_name, n))
@@ -756,6 +847,7 @@ class MainController:
 
     def _on_lock(self) -> None:
         self._session_timer.stop()
+        self._flush_pending_commit()
         lock(self._alias)
         self._token = ""
         QMessageBox.information(
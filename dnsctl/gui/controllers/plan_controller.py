@@ -2,12 +2,13 @@
 
 import html
 import logging
+from functools import lru_cache
 
 from PyQt6.QtCore import QThread, pyqtSignal, Qt
 from PyQt6.QtGui import QPalette, QCursor
 from PyQt6.QtWidgets import QApplication, QDialog, QMessageBox
 
-from dnsctl.core.sync_engine import SyncEngine, Plan
+from dnsctl.core.sync_engine import SyncEngine, Plan, PlanAction
 
 
 class _PlanWorker(QThread):
@@ -50,6 +51,49 @@ class _ApplyWorker(QThread):
 
 logger = logging.getLogger(__name__)
 
+# HTML fragments for _format_plan_html, filled once per row
+_ACTION_SYMBOLS = {"create": "+", "update": "~", "delete": "-"}
+_DRIFT_ITEM = "<li>{} {} {} &rarr; {}</li>"
+_DRIFT_MODIFIED_ITEM = "<li>~ {} {}: {} &rarr; {}</li>"
+_ACTION_CELL = "<td style='padding:4px 8px;color:{color}'><b>{symbol} {action}</b></td>"
+_ACTION_ROW = (
+    "<tr style='background:transparent'>"
+    "{action_cell}"
+    "<td style='padding:4px 8px'>{type}</td>"
+    "<td style='padding:4px 8px'>{name}</td>"
+    "<td style='padding:4px 8px'>{content}</td>"
+    "<td style='padding:4px 8px;color:{protected_color}'>{protected}</td>"
+    "</tr>"
+)
+
+
+def _esc(value) -> str:
+    """``html.escape`` for any field value.
+
+    Records from the API or an imported file may hold numbers or ``None``.
+    """
+    return html.escape(str(value))
+
+
+@lru_cache(maxsize=2048)
+def _esc_label(value) -> str:
+    """``_esc`` for record types and names, which repeat across rows."""
+    return _esc(value)
+
+
+def _record_content(a: PlanAction, esc) -> str:
+    return esc(a.record.get("content", ""))
+
+
+def _update_content(a: PlanAction, esc) -> str:
+    if not a.before:
+        return _record_content(a, esc)
+    return f"{esc(a.before.get('content', ''))} &rarr; {esc(a.record.get('content', ''))}"
+
+
+# Content cell builder per action kind; other kinds show the record content
+_CONTENT_BUILDERS = {"update": _update_content}
+
 
 class PlanController:
     """Drives the plan preview dialog.
@@ -129,16 +173,20 @@ class PlanController:
         # Summary
         if not plan.has_changes:
             msg = "No local changes to apply."
-            if plan.drift and plan.drift.has_changes:
-                msg += f"  Drift detected: {plan.drift.summary}"
+            if not (plan.drift and plan.drift.has_changes):
+                # Nothing to show and nothing protected: skip the HTML renderer
+                d.summaryLabel.setText(msg)
+                d.planBrowser.setPlainText("Everything is in sync. No actions needed.")
+                return
+            msg += f"  Drift detected: {plan.drift.summary}"
             d.summaryLabel.setText(msg)
         else:
             d.summaryLabel.setText(f"Plan: {plan.summary}")
             d.applyButton.setEnabled(True)
 
         # Protected-record warning
-        if plan.has_protected:
-            n = sum(1 for a in plan.actions if a.protected)
+        n = plan.protected_count
+        if n:
             d.warningLabel.setText(
                 f"\u26a0 {n} protected record(s) will be skipped. "
                 "Use Force Apply to override."
@@ -159,13 +207,10 @@ class PlanController:
         # If background is dark (luminance < 128), we're in dark mode
         return bg_color.lightness() < 128
 
-    @staticmethod
-    def _esc(text: str) -> str:
-        return html.escape(str(text))
-
     def _format_plan_html(self, plan: Plan) -> str:
         lines: list[str] = []
-        esc = self._esc
+        esc = _esc
+        esc_label = _esc_label
         is_dark = self._is_dark_mode()
 
         # Theme-aware colors from semantic palette
@@ -179,7 +224,6 @@ class PlanController:
         action_delete_color  = _colors["danger"]
         protected_color      = _colors["warning"]
         table_header_bg = "#2d2d2d" if is_dark else "#f0f0f0"
-        table_row_bg = "transparent"
 
         # Drift section
         if plan.drift and plan.drift.has_changes:
@@ -188,30 +232,32 @@ class PlanController:
 
             if drift.added:
                 lines.append(f"<p style='color:{drift_added_color}'><b>Added remotely:</b></p><ul>")
-                for r in drift.added:
-                    lines.append(
-                        f"<li>+ {esc(r.get('type',''))} {esc(r.get('name',''))} "
-                        f"&rarr; {esc(r.get('content',''))}</li>"
-                    )
+                lines.extend([
+                    _DRIFT_ITEM.format("+", esc_label(r.get("type", "")),
+                                       esc_label(r.get("name", "")), esc(r.get("content", "")))
+                    for r in drift.added
+                ])
                 lines.append("</ul>")
 
             if drift.modified:
                 lines.append(f"<p style='color:{drift_modified_color}'><b>Modified remotely:</b></p><ul>")
-                for m in drift.modified:
-                    b, a = m["before"], m["after"]
-                    lines.append(
-                        f"<li>~ {esc(b.get('type',''))} {esc(b.get('name',''))}: "
-                        f"{esc(b.get('content',''))} &rarr; {esc(a.get('content',''))}</li>"
+                lines.extend([
+                    _DRIFT_MODIFIED_ITEM.format(
+                        esc_label(m["before"].get("type", "")),
+                        esc_label(m["before"].get("name", "")),
+                        esc(m["before"].get("content", "")), esc(m["after"].get("content", "")),
                     )
+                    for m in drift.modified
+                ])
                 lines.append("</ul>")
 
             if drift.removed:
                 lines.append(f"<p style='color:{drift_removed_color}'><b>Removed remotely:</b></p><ul>")
-                for r in drift.removed:
-                    lines.append(
-                        f"<li>- {esc(r.get('type',''))} {esc(r.get('name',''))} "
-                        f"&rarr; {esc(r.get('content',''))}</li>"
-                    )
+                lines.extend([
+                    _DRIFT_ITEM.format("-", esc_label(r.get("type", "")),
+                                       esc_label(r.get("name", "")), esc(r.get("content", "")))
+                    for r in drift.removed
+                ])
                 lines.append("</ul>")
 
         # Planned actions table
@@ -228,37 +274,34 @@ class PlanController:
                 "</tr>"
             )
 
-            _action_colors = {
+            action_colors = {
                 "create": action_create_color,
                 "update": action_update_color,
                 "delete": action_delete_color,
             }
-            _symbols = {"create": "+", "update": "~", "delete": "-"}
-
-            for a in plan.actions:
-                color = _action_colors.get(a.action, _colors["muted"])
-                symbol = _symbols.get(a.action, "?")
-                prot = "\u26a0 Yes" if a.protected else ""
-                content = esc(a.record.get("content", ""))
-                if a.action == "update" and a.before:
-                    content = (
-                        f"{esc(a.before.get('content', ''))} &rarr; "
-                        f"{esc(a.record.get('content', ''))}"
-                    )
-                lines.append(
-                    f"<tr style='background:{table_row_bg}'>"
-                    f"<td style='padding:4px 8px;color:{color}'>"
-                    f"<b>{symbol} {esc(a.action.upper())}</b></td>"
-                    f"<td style='padding:4px 8px'>{esc(a.record.get('type',''))}</td>"
-                    f"<td style='padding:4px 8px'>{esc(a.record.get('name',''))}</td>"
-                    f"<td style='padding:4px 8px'>{content}</td>"
-                    f"<td style='padding:4px 8px;color:{protected_color}'>{prot}</td>"
-                    f"</tr>"
+            # The action cell only depends on the kind: build it once per kind
+            action_cells = {
+                kind: _ACTION_CELL.format(
+                    color=action_colors.get(kind, _colors["muted"]),
+                    symbol=_ACTION_SYMBOLS.get(kind, "?"),
+                    action=esc(kind.upper()),
+                )
+                for kind in {a.action for a in plan.actions}
+            }
+            get_content = _CONTENT_BUILDERS.get
+            lines.extend([
+                _ACTION_ROW.format(
+                    action_cell=action_cells[a.action],
+                    type=esc_label(a.record.get("type", "")),
+                    name=esc_label(a.record.get("name", "")),
+                    content=get_content(a.action, _record_content)(a, esc),
+                    protected_color=protected_color,
+                    protected="\u26a0 Yes" if a.protected else "",
                 )
+                for a in plan.actions
+            ])
 
             lines.append("</table>")
-        elif not (plan.drift and plan.drift.has_changes):
-            lines.append("<p><i>Everything is in sync. No actions needed.</i></p>")
 
         return "\n".join(lines)
 
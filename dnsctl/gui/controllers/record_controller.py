@@ -1,13 +1,37 @@
 """Record controller — populates QTableViews with DNS records, supports CRUD."""
 
+from difflib import SequenceMatcher
+
 from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
-from PyQt6.QtWidgets import QMainWindow, QTableView, QHeaderView
+from PyQt6.QtWidgets import QMainWindow, QTableView, QHeaderView, QWidget
 
 from dnsctl.config import SUPPORTED_RECORD_TYPES
 from dnsctl.core.state_manager import load_protected_records
 
 # Column definitions for the record table
 _COLUMNS = ("Type", "Name", "Content", "TTL", "Priority", "Proxied", "Protected")
+_PROTECTED_COL = _COLUMNS.index("Protected")
+
+
+_PRIORITY_TYPES = frozenset(("MX", "SRV"))
+
+
+def _row_key(rec: dict) -> tuple[str, str, str]:
+    return (rec.get("type", ""), rec.get("name", ""), rec.get("content", ""))
+
+
+def _display_row(rec: dict) -> tuple[str, ...]:
+    """Display strings for every column of *rec* except Protected."""
+    ttl = rec.get("ttl", 1)
+    rtype = rec.get("type", "")
+    return (
+        rtype,
+        rec.get("name", ""),
+        rec.get("content", ""),
+        "Auto" if ttl == 1 else str(ttl),
+        str(rec.get("priority", "")) if rtype in _PRIORITY_TYPES else "",
+        "Yes" if rec.get("proxied") else "No",
+    )
 
 
 class RecordTableModel(QAbstractTableModel):
@@ -16,14 +40,118 @@ class RecordTableModel(QAbstractTableModel):
     def __init__(self, records: list[dict] | None = None) -> None:
         super().__init__()
         self._records: list[dict] = records or []
+        # Cell strings per row, kept in step with _records: data() is called
+        # for every visible cell on each repaint, so it only indexes here.
+        self._display: list[tuple[str, ...]] = [_display_row(r) for r in self._records]
         self._protected_set: set[tuple[str, str]] = set()
+        # Record id → row, built on first lookup and dropped whenever rows
+        # move (insert/remove), so edits don't scan the list each time
+        self._id_rows: dict[str, int] | None = None
 
     def set_records(self, records: list[dict]) -> None:
         self.beginResetModel()
         self._records = list(records)
+        self._display = [_display_row(r) for r in self._records]
+        self._id_rows = None
         self._refresh_protected()
         self.endResetModel()
 
+    def update_records(self, records: list[dict]) -> None:
+        """Switch to *records*, signalling only the rows that differ.
+
+        Rows are matched by (type, name, content); unmatched runs are
+        removed/inserted and matched rows whose other fields changed get a
+        ``dataChanged``.  Unlike :meth:`set_records` this keeps the views'
+        selection and scroll position, and the type proxies only re-filter
+        the affected rows.
+        """
+        old = self._records
+        display = self._display
+        new = list(records)
+        if not old or not new:
+            self.set_records(new)
+            return
+        old_protected = self._protected_set
+        self._refresh_protected()
+        self._id_rows = None
+
+        last_col = len(_COLUMNS) - 1
+        matcher = SequenceMatcher(
+            None, [_row_key(r) for r in old], [_row_key(r) for r in new], autojunk=False,
+        )
+        # Walk backwards so earlier row numbers stay valid while editing
+        for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+            if tag == "equal":
+                # One dataChanged per run of adjacent changed rows, not per row
+                first = None
+                for row, rec in zip(range(i1, i2), new[j1:j2]):
+                    if old[row] != rec:
+                        display[row] = _display_row(rec)
+                        if first is None:
+                            first = row
+                    elif first is not None:
+                        self.dataChanged.emit(self.index(first, 0), self.index(row - 1, last_col))
+                        first = None
+                    old[row] = rec
+                if first is not None:
+                    self.dataChanged.emit(self.index(first, 0), self.index(i2 - 1, last_col))
+                continue
+            if i2 > i1:
+                self.beginRemoveRows(QModelIndex(), i1, i2 - 1)
+                del old[i1:i2]
+                del display[i1:i2]
+                self.endRemoveRows()
+            if j2 > j1:
+                self.beginInsertRows(QModelIndex(), i1, i1 + j2 - j1 - 1)
+                old[i1:i1] = new[j1:j2]
+                display[i1:i1] = [_display_row(r) for r in new[j1:j2]]
+                self.endInsertRows()
+
+        if self._protected_set != old_protected:
+            self.dataChanged.emit(
+                self.index(0, _PROTECTED_COL), self.index(len(old) - 1, _PROTECTED_COL),
+            )
+
+    def append_record(self, record: dict) -> None:
+        row = len(self._records)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._records.append(record)
+        self._display.append(_display_row(record))
+        if self._id_rows is not None and record.get("id"):
+            self._id_rows[record["id"]] = row
+        self.endInsertRows()
+
+    def replace_record(self, row: int, record: dict) -> None:
+        if self._records[row].get("id") != record.get("id"):
+            self._id_rows = None
+        self._records[row] = record
+        self._display[row] = _display_row(record)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    def remove_record(self, row: int) -> None:
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._records[row]
+        del self._display[row]
+        self._id_rows = None
+        self.endRemoveRows()
+
+    def find_row(self, record: dict) -> int | None:
+        """Return the row holding *record*, matched by id or, for records
+        without one, by identity or (type, name, content)."""
+        rec_id = record.get("id")
+        if rec_id:
+            if self._id_rows is None:
+                self._id_rows = {r["id"]: i for i, r in enumerate(self._records) if r.get("id")}
+            return self._id_rows.get(rec_id)
+        key = _row_key(record)
+        for i, r in enumerate(self._records):
+            if r is record or (not r.get("id") and _row_key(r) == key):
+                return i
+        return None
+
+    def record_type(self, row: int) -> str:
+        return self._display[row][0]
+
     def _refresh_protected(self) -> None:
         """Reload the protected records set from state."""
         protected = load_protected_records()
@@ -55,25 +183,11 @@ class RecordTableModel(QAbstractTableModel):
     def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
         if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
             return None
-        rec = self._records[index.row()]
+        row = self._display[index.row()]
         col = index.column()
-        if col == 0:
-            return rec.get("type", "")
-        if col == 1:
-            return rec.get("name", "")
-        if col == 2:
-            return rec.get("content", "")
-        if col == 3:
-            ttl = rec.get("ttl", 1)
-            return "Auto" if ttl == 1 else str(ttl)
-        if col == 4:
-            return str(rec.get("priority", "")) if rec.get("type") in ("MX", "SRV") else ""
-        if col == 5:
-            return "Yes" if rec.get("proxied") else "No"
-        if col == 6:
-            key = (rec.get("type", ""), rec.get("name", ""))
-            return "\U0001f6e1" if key in self._protected_set else ""
-        return None
+        if col == _PROTECTED_COL:
+            return "\U0001f6e1" if row[:2] in self._protected_set else ""
+        return row[col]
 
     def flags(self, index: QModelIndex) -> Qt.ItemFlag:
         return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
@@ -82,16 +196,14 @@ class RecordTableModel(QAbstractTableModel):
 class _TypeFilterProxy(QSortFilterProxyModel):
     """Filters records by DNS type."""
 
-    def __init__(self, record_type: str | None = None) -> None:
+    def __init__(self, record_type: str) -> None:
         super().__init__()
-        self._type = record_type  # None = show all
+        self._type = record_type
 
     def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
-        if self._type is None:
-            return True
-        model = self.sourceModel()
-        idx = model.index(source_row, 0)
-        return model.data(idx) == self._type
+        # Called once per source row on every change: read the cached type
+        # rather than building an index and going through data().
+        return self.sourceModel().record_type(source_row) == self._type
 
 
 class RecordController:
@@ -102,7 +214,8 @@ class RecordController:
         self._model = RecordTableModel()
 
         # Map each tab to its QTableView + proxy
-        self._proxies: dict[str, _TypeFilterProxy] = {}
+        self._proxies: dict[str, QSortFilterProxyModel] = {}
+        self._tables: list[QTableView] = []
         self._setup_tables()
 
     def _setup_tables(self) -> None:
@@ -122,10 +235,13 @@ class RecordController:
             if table is None:
                 continue
 
-            proxy = _TypeFilterProxy(rec_type)
+            # The "All" tab only sorts: a plain proxy has no per-row
+            # Python filter callback at all.
+            proxy = QSortFilterProxyModel() if rec_type is None else _TypeFilterProxy(rec_type)
             proxy.setSourceModel(self._model)
             table.setModel(proxy)
             self._proxies[widget_name] = proxy
+            self._tables.append(table)
 
             # Stretch columns to fill
             header = table.horizontalHeader()
@@ -133,9 +249,27 @@ class RecordController:
                 header.setStretchLastSection(True)
                 header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
 
+        # Tab page → its table, so selection lookups don't walk the widget tree
+        self._page_tables: dict[QWidget, QTableView] = {}
+        tabs = getattr(self._window, "recordTabs", None)
+        if tabs is not None:
+            for i in range(tabs.count()):
+                page = tabs.widget(i)
+                table = page.findChild(QTableView)
+                if table is not None:
+                    self._page_tables[page] = table
+
     def populate(self, records: list[dict]) -> None:
         """Replace the displayed records."""
-        self._model.set_records(records)
+        # Row signals for a large difference would otherwise repaint every
+        # tab per change; hold painting until the model is settled.
+        for table in self._tables:
+            table.setUpdatesEnabled(False)
+        try:
+            self._model.update_records(records)
+        finally:
+            for table in self._tables:
+                table.setUpdatesEnabled(True)
 
     def refresh_protected(self) -> None:
         """Refresh the protected column after protect/unprotect changes."""
@@ -143,8 +277,12 @@ class RecordController:
 
     @property
     def records(self) -> list[dict]:
-        """Return the current records list."""
-        return list(self._model._records)
+        """Return the current records list.
+
+        This is the model's own list, not a copy: treat it as read-only and
+        change records through the controller's methods.
+        """
+        return self._model._records
 
     def get_selected_record(self) -> dict | None:
         """Return the selected record from the currently visible table, or None."""
@@ -154,11 +292,7 @@ class RecordController:
         if current_widget is None:
             return None
 
-        # Find the QTableView inside the current tab
-        table: QTableView | None = None
-        for child in current_widget.findChildren(QTableView):
-            table = child
-            break
+        table = self._page_tables.get(current_widget)
         if table is None:
             return None
 
@@ -179,61 +313,32 @@ class RecordController:
             return self._model._records[row]
         return None
 
+    # PyQt drops signal arguments a slot does not accept, so the no-argument
+    # callbacks are connected directly rather than through a wrapper lambda.
+
     def connect_selection_changed(self, callback) -> None:
         """Connect selection-changed signals from all tables to *callback*."""
-        for widget_name in self._proxies:
-            table: QTableView = getattr(self._window, widget_name, None)
-            if table is not None and table.selectionModel():
-                table.selectionModel().selectionChanged.connect(
-                    lambda _sel, _desel, cb=callback: cb()
-                )
+        for table in self._tables:
+            if table.selectionModel():
+                table.selectionModel().selectionChanged.connect(callback)
 
     def connect_double_click(self, callback) -> None:
         """Connect doubleClicked signals from all tables to *callback*."""
-        for widget_name in self._proxies:
-            table: QTableView = getattr(self._window, widget_name, None)
-            if table is not None:
-                table.doubleClicked.connect(
-                    lambda _index, cb=callback: cb()
-                )
+        for table in self._tables:
+            table.doubleClicked.connect(callback)
 
     def add_record(self, record: dict) -> None:
         """Append a record to the in-memory list."""
-        self._model.beginInsertRows(QModelIndex(), len(self._model._records), len(self._model._records))
-        self._model._records.append(record)
-        self._model.endInsertRows()
+        self._model.append_record(record)
 
     def update_record(self, old_record: dict, new_record: dict) -> None:
         """Replace a record in-place by identity, id, or composite key."""
-        old_id = old_record.get("id")
-        old_key = (old_record.get("type", ""), old_record.get("name", ""), old_record.get("content", ""))
-        for i, r in enumerate(self._model._records):
-            matched = (
-                r is old_record
-                or (old_id and r.get("id") == old_id)
-                or (not old_id and not r.get("id")
-                    and (r.get("type", ""), r.get("name", ""), r.get("content", "")) == old_key)
-            )
-            if matched:
-                self._model._records[i] = new_record
-                tl = self._model.index(i, 0)
-                br = self._model.index(i, self._model.columnCount() - 1)
-                self._model.dataChanged.emit(tl, br)
-                return
+        row = self._model.find_row(old_record)
+        if row is not None:
+            self._model.replace_record(row, new_record)
 
     def delete_record(self, record: dict) -> None:
         """Remove a record from the in-memory list."""
-        rec_id = record.get("id")
-        rec_key = (record.get("type", ""), record.get("name", ""), record.get("content", ""))
-        for i, r in enumerate(self._model._records):
-            matched = (
-                r is record
-                or (rec_id and r.get("id") == rec_id)
-                or (not rec_id and not r.get("id")
-                    and (r.get("type", ""), r.get("name", ""), r.get("content", "")) == rec_key)
-            )
-            if matched:
-                self._model.beginRemoveRows(QModelIndex(), i, i)
-                self._model._records.pop(i)
-                self._model.endRemoveRows()
-                return
+        row = self._model.find_row(record)
+        if row is not None:
+            self._model.remove_record(row)
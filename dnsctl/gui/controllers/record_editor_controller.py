@@ -10,10 +10,19 @@ from dnsctl.core.validations import validate_record
 logger = logging.getLogger(__name__)
 
 # Types that support the Proxied toggle
-_PROXY_TYPES = {"A", "AAAA", "CNAME"}
+_PROXY_TYPES = frozenset({"A", "AAAA", "CNAME"})
 # Types that use the Priority field
-_PRIORITY_TYPES = {"MX", "SRV"}
+_PRIORITY_TYPES = frozenset({"MX", "SRV"})
 
+# Placeholder for the content field, per record type
+_CONTENT_HINTS = {
+    "A": "IPv4 address (e.g. 1.2.3.4)",
+    "AAAA": "IPv6 address (e.g. 2001:db8::1)",
+    "CNAME": "Target hostname (e.g. other.example.com)",
+    "MX": "Mail server (e.g. mail.example.com)",
+    "TXT": "Text value (e.g. v=spf1 include:...)",
+    "SRV": "Target (e.g. sip.example.com)",
+}
 
 
 class RecordEditorController:
@@ -93,15 +102,7 @@ class RecordEditorController:
         d.prioritySpin.setVisible(show_priority)
 
         # Update placeholder hints
-        hints = {
-            "A": "IPv4 address (e.g. 1.2.3.4)",
-            "AAAA": "IPv6 address (e.g. 2001:db8::1)",
-            "CNAME": "Target hostname (e.g. other.example.com)",
-            "MX": "Mail server (e.g. mail.example.com)",
-            "TXT": "Text value (e.g. v=spf1 include:...)",
-            "SRV": "Target (e.g. sip.example.com)",
-        }
-        d.contentEdit.setPlaceholderText(hints.get(rtype, ""))
+        d.contentEdit.setPlaceholderText(_CONTENT_HINTS.get(rtype, ""))
 
     def _on_protected_toggled(self, checked: bool) -> None:
         self._dialog.reasonLabel.setVisible(checked)
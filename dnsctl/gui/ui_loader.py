@@ -0,0 +1,37 @@
+"""Load Qt Designer ``.ui`` files, parsing each file once per process.
+
+Usage::
+
+    from dnsctl.gui.ui_loader import load_ui
+    dialog = load_ui(UI_DIR / "record_editor.ui")
+
+``uic.loadUi`` re-reads and re-parses the XML on every call; dialogs such
+as the record editor are opened many times per session, so the generated
+form class is cached and only instantiated per call.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+
+from PyQt6 import uic
+from PyQt6.QtWidgets import QWidget
+
+
+@lru_cache(maxsize=None)
+def _form_class(path: str) -> type:
+    """Return a widget class for *path* whose ``setupUi`` builds the form."""
+    form, base = uic.loadUiType(path)
+    return type(form.__name__, (base, form), {})
+
+
+def load_ui(path: Path | str) -> QWidget:
+    """Return a new widget built from the ``.ui`` file at *path*.
+
+    Child widgets are attributes of the returned widget, as with
+    ``uic.loadUi``.
+    """
+    widget = _form_class(str(path))()
+    widget.setupUi(widget)
+    return widget
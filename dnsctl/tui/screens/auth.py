@@ -133,9 +133,9 @@ class LoginScreen(Screen):
             self.query_one("#login-btn", Button).disabled = False
 
         try:
-            from dnsctl.core.cloudflare_client import CloudflareClient
+            from dnsctl.core.cloudflare_client import get_client
 
-            CloudflareClient().verify_token(token)
+            get_client().verify_token(token)
         except Exception as exc:
             self.app.call_from_thread(_set_error, f"Token verification failed: {exc}")
             return
@@ -204,16 +204,16 @@ class DashboardScreen(Screen):
         self.app.call_from_thread(status.update, "Syncing all zones from Cloudflare…")
         try:
             from dnsctl.config import ACCOUNTS_DIR
-            from dnsctl.core.cloudflare_client import CloudflareClient
+            from dnsctl.core.cloudflare_client import get_client
             from dnsctl.core.commit_messages import sync_message
             from dnsctl.core.git_manager import GitManager
             from dnsctl.core.state_manager import save_zone
 
-            cf = CloudflareClient()
+            cf = get_client()
             zones = cf.list_zones(self._token)
             synced: list[tuple[str, int]] = []
-            for z in zones:
-                records = cf.list_records(self._token, z["id"])
+            fetched = cf.iter_records_many(self._token, [z["id"] for z in zones])
+            for z, records in zip(zones, fetched):
                 save_zone(z["id"], z["name"], records, self._alias)
                 synced.append((z["name"], len(records)))
 
@@ -227,12 +227,12 @@ class DashboardScreen(Screen):
     def _sync_single(self, zone_name: str, status: Label) -> None:
         try:
             from dnsctl.config import ACCOUNTS_DIR
-            from dnsctl.core.cloudflare_client import CloudflareClient
+            from dnsctl.core.cloudflare_client import get_client
             from dnsctl.core.commit_messages import sync_message
             from dnsctl.core.git_manager import GitManager
             from dnsctl.core.state_manager import save_zone
 
-            cf = CloudflareClient()
+            cf = get_client()
             zones = cf.list_zones(self._token)
             target = next((z for z in zones if z["name"] == zone_name), None)
             if target is None:
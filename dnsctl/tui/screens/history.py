@@ -1,6 +1,5 @@
 """History screen — browse git commits, preview state, rollback, export."""
 
-import json
 import logging
 from pathlib import Path
 
@@ -13,6 +12,8 @@ from textual.containers import Horizontal, ScrollableContainer, Vertical
 from textual.screen import Screen
 from textual.widgets import Button, DataTable, Footer, Header, Label, Static
 
+from dnsctl.core import serialization
+
 
 class HistoryScreen(Screen):
     """Git commit browser for a single account's state repo."""
@@ -140,17 +141,18 @@ class HistoryScreen(Screen):
 
         lines += ["", "[dim]── zone snapshot ──[/dim]"]
         found_any = False
+        contents = git.show_files_at(commit["sha"], [f"zones/{z}.json" for z in zones])
         for zone_name in zones:
-            content = git.show_file_at(commit["sha"], f"zones/{zone_name}.json")
+            content = contents[f"zones/{zone_name}.json"]
             if not content:
                 continue
             found_any = True
             try:
-                data = json.loads(content)
+                data = serialization.loads(content)
                 n = len(data.get("records", []))
                 ts = data.get("last_synced_at", "?")[:19].replace("T", " ")
                 lines.append(f"[green]{zone_name}[/green]  {n} records  (synced: {ts})")
-            except json.JSONDecodeError:
+            except ValueError:
                 lines.append(f"[red]{zone_name}[/red]  (parse error)")
 
         if not found_any:
@@ -257,12 +259,13 @@ class HistoryScreen(Screen):
         git = GitManager(ACCOUNTS_DIR / self._alias)
         zones = list_synced_zones(self._alias)
         export_data = {}
+        contents = git.show_files_at(commit["sha"], [f"zones/{z}.json" for z in zones])
         for zone_name in zones:
-            content = git.show_file_at(commit["sha"], f"zones/{zone_name}.json")
+            content = contents[f"zones/{zone_name}.json"]
             if content:
                 try:
-                    export_data[zone_name] = json.loads(content)
-                except json.JSONDecodeError:
+                    export_data[zone_name] = serialization.loads(content)
+                except ValueError:
                     pass
 
         if not export_data:
@@ -273,7 +276,7 @@ class HistoryScreen(Screen):
             return
 
         dest = Path.home() / f"dnsctl-export-{commit['short_sha']}.json"
-        dest.write_text(json.dumps(export_data, indent=2), encoding="utf-8")
+        dest.write_bytes(serialization.dumps(export_data, indent=True))
         self.app.call_from_thread(
             self.query_one("#history-status", Label).update,
             f"[green]Exported {len(export_data)} zone(s) to: {dest}[/green]",
@@ -122,7 +122,7 @@ class PlanScreen(Screen):
                 notes,
             )
 
-        n_protected = sum(1 for a in plan.actions if a.protected)
+        n_protected = plan.protected_count
         summary = plan.summary
         if n_protected:
             summary += f"  ({n_protected} protected — use Force Apply to override)"
@@ -0,0 +1,39 @@
+"""Shared pytest fixtures."""
+
+import sys
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def tmp_state(tmp_path):
+    """Patch all state directory paths to a temp dir for isolation."""
+    accounts_dir = tmp_path / "accounts"
+    accounts_file = tmp_path / "accounts.json"
+    logs = tmp_path / "logs"
+    metadata = tmp_path / "metadata.json"
+    config = tmp_path / "config.json"
+
+    with patch.multiple(
+        "dnsctl.core.state_manager",
+        STATE_DIR=tmp_path,
+        ACCOUNTS_DIR=accounts_dir,
+        ACCOUNTS_FILE=accounts_file,
+        LOGS_DIR=logs,
+        METADATA_FILE=metadata,
+        CONFIG_FILE=config,
+        _LEGACY_ZONES_DIR=tmp_path / "zones",
+    ):
+        yield tmp_path
+
+
+@pytest.fixture(autouse=True)
+def _forget_shared_git_managers():
+    """Close the shared GitManagers a test registered, so none leak into the next."""
+    yield
+    git_manager = sys.modules.get("dnsctl.core.git_manager")
+    if git_manager is None:
+        return
+    for state_dir in list(git_manager._managers):
+        git_manager.forget_git_manager(state_dir)
@@ -0,0 +1,36 @@
+"""Tests for cli.main — start-up imports and output helpers."""
+
+import subprocess
+import sys
+
+
+class TestStartup:
+    def test_import_skips_heavy_dependencies(self):
+        # Run in a fresh interpreter: other tests import these modules
+        code = (
+            "import sys, dnsctl.cli.main\n"
+            "heavy = ('git', 'requests', 'cryptography', 'keyring', 'PyQt6', 'textual')\n"
+            "print(','.join(m for m in heavy if m in sys.modules))\n"
+        )
+        out = subprocess.run([sys.executable, "-c", code],
+                             capture_output=True, text=True, check=True)
+        assert out.stdout.strip() == ""
+
+
+class TestPrintPlan:
+    def test_actions_printed_in_order(self, capsys):
+        from dnsctl.cli.main import _print_plan
+        from dnsctl.core.sync_engine import Plan, PlanAction
+
+        rec = {"type": "A", "name": "x.com", "content": "1.2.3.4", "ttl": 1}
+        plan = Plan("x.com", "z1", actions=[
+            PlanAction("create", rec),
+            PlanAction("update", dict(rec, content="5.6.7.8"), before=rec),
+            PlanAction("delete", rec, protected=True),
+        ])
+        _print_plan(plan)
+        out = capsys.readouterr().out.splitlines()
+        assert len(out) == 3
+        assert "CREATE" in out[0]
+        assert "1.2.3.4 → 5.6.7.8" in out[1]
+        assert out[2].endswith("[PROTECTED]")
@@ -1,10 +1,19 @@
 """Tests for core.cloudflare_client — API interactions with mocked responses."""
 
+import json
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from dnsctl.core.cloudflare_client import CloudflareClient, CloudflareAPIError, _normalize_record
+from dnsctl.core.cloudflare_client import (
+    CloudflareClient,
+    CloudflareAPIError,
+    _normalize_record,
+    get_client,
+    sanitize_token,
+)
+
+_TOKEN = "aB3_-" * 8
 
 
 class TestNormalizeRecord:
@@ -40,11 +49,32 @@ class TestNormalizeRecord:
         assert rec["data"]["target"] == "sip.example.com"
 
 
+class TestSanitizeToken:
+    @pytest.mark.parametrize("raw", [
+        _TOKEN,
+        f"  '{_TOKEN}' ",
+        f'"Bearer {_TOKEN}"',
+        f"Authorization: Bearer {_TOKEN}",
+    ])
+    def test_extracts_token(self, raw):
+        assert sanitize_token(raw) == _TOKEN
+
+    @pytest.mark.parametrize("raw, message", [
+        ("", "empty"),
+        ("curl https://api.cloudflare.com", "curl command"),
+        (f"curl -H 'Authorization: Bearer {_TOKEN}' https://x", "Invalid API token"),
+        ("short", "Invalid API token"),
+    ])
+    def test_rejects_bad_input(self, raw, message):
+        with pytest.raises(ValueError, match=message):
+            sanitize_token(raw)
+
+
 class TestCloudflareClient:
     def _mock_response(self, json_data, status_code=200):
         resp = MagicMock()
         resp.status_code = status_code
-        resp.json.return_value = json_data
+        resp.content = json.dumps(json_data).encode()
         resp.headers = {}
         return resp
 
@@ -67,6 +97,60 @@ class TestCloudflareClient:
         assert len(zones) == 2
         assert zones[0]["name"] == "example.com"
 
+    def test_token_sent_per_request_not_stored_on_session(self):
+        client = CloudflareClient()
+        with patch.object(client._session, "request",
+                          return_value=self._mock_response({"success": True, "result": {}})) as req:
+            client.verify_token("fake-token")
+        assert req.call_args.kwargs["headers"] == {"Authorization": "Bearer fake-token"}
+        assert "Authorization" not in client._session.headers
+        assert client._session.headers["Content-Type"] == "application/json"
+
+    def test_get_client_is_shared(self):
+        assert get_client() is get_client()
+
+    @patch("dnsctl.core.cloudflare_client.requests.Session")
+    def test_get_zone_by_name_uses_name_filter(self, mock_session_cls):
+        mock_session = MagicMock()
+        mock_session_cls.return_value = mock_session
+
+        mock_session.request.return_value = self._mock_response({
+            "success": True,
+            "result": [{"id": "z2", "name": "test.dev", "status": "active",
+                        "modified_on": "2024-01-01T00:00:00Z"}],
+        })
+
+        client = CloudflareClient()
+        zone = client.get_zone_by_name("fake-token", "test.dev")
+        assert zone["id"] == "z2"
+        assert zone["modified_on"] == "2024-01-01T00:00:00Z"
+        assert mock_session.request.call_args.kwargs["params"] == {"name": "test.dev"}
+
+        mock_session.request.return_value = self._mock_response({"success": True, "result": []})
+        assert client.get_zone_by_name("fake-token", "missing.dev") is None
+
+    @patch("dnsctl.core.cloudflare_client.requests.Session")
+    def test_records_marker_tracks_record_edits(self, mock_session_cls):
+        mock_session = MagicMock()
+        mock_session_cls.return_value = mock_session
+
+        def page(*stamps):
+            return self._mock_response({
+                "success": True,
+                "result": [{"id": f"r{i}", "type": "A", "modified_on": ts}
+                           for i, ts in enumerate(stamps)],
+                "result_info": {"total_count": 250},
+            })
+
+        client = CloudflareClient()
+        mock_session.request.return_value = page("2024-01-01T00:00:00Z", "2024-03-01T00:00:00Z")
+        before = client.records_marker("fake-token", "z1")
+        assert before == "250:2024-03-01T00:00:00Z"
+        assert mock_session.request.call_args.kwargs["params"] == {"page": 1, "per_page": 100}
+
+        mock_session.request.return_value = page("2024-05-01T00:00:00Z", "2024-03-01T00:00:00Z")
+        assert client.records_marker("fake-token", "z1") != before
+
     @patch("dnsctl.core.cloudflare_client.requests.Session")
     def test_list_records_filters_unsupported(self, mock_session_cls):
         mock_session = MagicMock()
@@ -87,6 +171,62 @@ class TestCloudflareClient:
         assert len(records) == 1
         assert records[0]["type"] == "A"
 
+    @patch("dnsctl.core.cloudflare_client.requests.Session")
+    def test_list_records_fetches_all_pages_in_order(self, mock_session_cls):
+        mock_session = MagicMock()
+        mock_session_cls.return_value = mock_session
+
+        def respond(method, url, **kwargs):
+            page = kwargs["params"]["page"]
+            return self._mock_response({
+                "success": True,
+                "result": [{"id": f"r{page}", "type": "A", "name": "x.com",
+                            "content": "1.2.3.4", "ttl": 1},
+                           {"id": f"ns{page}", "type": "NS", "name": "x.com",
+                            "content": "ns1.x.com", "ttl": 1}],
+                "result_info": {"page": page, "total_pages": 5},
+            })
+        mock_session.request.side_effect = respond
+
+        client = CloudflareClient()
+        records = client.list_records("fake-token", "z1")
+        assert [r["id"] for r in records] == ["r1", "r2", "r3", "r4", "r5"]
+        assert mock_session.request.call_count == 5
+
+    def test_list_records_many_keeps_zone_order(self):
+        client = CloudflareClient()
+        with patch.object(client, "list_records",
+                          side_effect=lambda token, zid: [{"zone": zid}]) as lr:
+            result = client.list_records_many("fake-token", ["z1", "z2", "z3"])
+        assert result == [[{"zone": "z1"}], [{"zone": "z2"}], [{"zone": "z3"}]]
+        assert lr.call_count == 3
+        assert client.list_records_many("fake-token", []) == []
+
+    def test_iter_records_many_is_lazy(self):
+        client = CloudflareClient()
+        with patch.object(client, "list_records",
+                          side_effect=lambda token, zid: [{"zone": zid}]) as lr:
+            it = client.iter_records_many("fake-token", ["z1"])
+            assert lr.call_count == 0
+            assert list(it) == [[{"zone": "z1"}]]
+
+    def test_batch_records_payload_and_result(self):
+        client = CloudflareClient()
+        rec = {"type": "A", "name": "x.com", "content": "1.2.3.4", "ttl": 1}
+        api_rec = dict(rec, id="r9", proxied=False)
+        resp = self._mock_response({"success": True, "result": {
+            "deletes": [{"id": "r1"}], "puts": [api_rec], "posts": [api_rec],
+        }})
+        with patch.object(client._session, "request", return_value=resp) as req:
+            out = client.batch_records("fake-token", "z1", posts=[rec],
+                                       puts=[("r9", rec)], deletes=["r1"])
+        assert req.call_args.args[1].endswith("/zones/z1/dns_records/batch")
+        body = req.call_args.kwargs["json"]
+        assert body["deletes"] == [{"id": "r1"}]
+        assert body["puts"][0]["id"] == "r9"
+        assert "id" not in body["posts"][0]
+        assert out == {"posts": [api_rec], "puts": [api_rec]}
+
     @patch("dnsctl.core.cloudflare_client.requests.Session")
     def test_api_error_raised(self, mock_session_cls):
         mock_session = MagicMock()
@@ -71,6 +71,16 @@ class TestRecordsEqual:
         b = {"id": "1", "type": "MX", "name": "x.com", "content": "mx.x.com", "ttl": 1, "proxied": False, "priority": 20}
         assert not records_equal(a, b)
 
+    def test_priority_ignored_for_a_records(self):
+        a = {"type": "A", "name": "x.com", "content": "1.2.3.4", "priority": 10}
+        b = {"type": "A", "name": "x.com", "content": "1.2.3.4", "priority": 20}
+        assert records_equal(a, b)
+
+    def test_srv_data_matters(self):
+        a = {"type": "SRV", "name": "_s._tcp.x.com", "data": {"port": 1}}
+        b = {"type": "SRV", "name": "_s._tcp.x.com", "data": {"port": 2}}
+        assert not records_equal(a, b)
+
 
 # ------------------------------------------------------------------
 # compute_diff
@@ -150,6 +160,34 @@ class TestComputeDiff:
         diff = compute_diff([], [])
         assert not diff.has_changes
 
+    def test_mixed_id_and_keyed_records(self):
+        base = [
+            {"id": "1", "type": "A", "name": "x.com", "content": "1.1.1.1"},
+            {"type": "TXT", "name": "x.com", "content": "v=spf1"},
+        ]
+        target = [
+            {"id": "1", "type": "A", "name": "x.com", "content": "2.2.2.2"},
+            {"type": "TXT", "name": "x.com", "content": "v=spf1"},
+        ]
+        diff = compute_diff(base, target)
+        assert diff.modified == [{"before": base[0], "after": target[0]}]
+        assert diff.unchanged == [base[1]]
+
+    def test_reversed_matches_swapped_arguments(self):
+        base = [
+            {"id": "1", "type": "A", "name": "keep.x.com", "content": "1.1.1.1"},
+            {"id": "2", "type": "A", "name": "modify.x.com", "content": "2.2.2.2"},
+            {"type": "TXT", "name": "x.com", "content": "gone"},
+        ]
+        target = [
+            {"id": "1", "type": "A", "name": "keep.x.com", "content": "1.1.1.1"},
+            {"id": "2", "type": "A", "name": "modify.x.com", "content": "9.9.9.9"},
+            {"type": "TXT", "name": "x.com", "content": "new"},
+        ]
+        reverse = compute_diff(target, base)
+        assert compute_diff(base, target).reversed() == reverse
+        assert reverse.modified[0]["before"]["content"] == "9.9.9.9"
+
 
 # ------------------------------------------------------------------
 # DiffResult.summary
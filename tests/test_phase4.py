@@ -1,54 +1,175 @@
 """Tests for Phase 4 — git rollback, export/import."""
 
 import json
+import shutil
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import PropertyMock, patch
 
 import pytest
 
 from dnsctl.core import state_manager
-from dnsctl.core.git_manager import GitManager
+from dnsctl.core.git_manager import GitManager, forget_git_manager, get_git_manager
 
 
 # ------------------------------------------------------------------
 # Fixtures
 # ------------------------------------------------------------------
 
-@pytest.fixture
-def tmp_state(tmp_path):
-    """Patch all state directory paths to a temp dir for isolation."""
-    accounts_dir = tmp_path / "accounts"
-    accounts_file = tmp_path / "accounts.json"
-    logs = tmp_path / "logs"
-    metadata = tmp_path / "metadata.json"
-    config = tmp_path / "config.json"
-
-    with patch.multiple(
-        "dnsctl.core.state_manager",
-        STATE_DIR=tmp_path,
-        ACCOUNTS_DIR=accounts_dir,
-        ACCOUNTS_FILE=accounts_file,
-        LOGS_DIR=logs,
-        METADATA_FILE=metadata,
-        CONFIG_FILE=config,
-        _LEGACY_ZONES_DIR=tmp_path / "zones",
-    ):
-        yield tmp_path
+_ALIAS = "test"
 
 
-_ALIAS = "test"
+@pytest.fixture(scope="session")
+def _initialised_repo(tmp_path_factory):
+    """A repo after ``auto_init``, built once and copied by ``git_repo``."""
+    path = tmp_path_factory.mktemp("initialised")
+    # Create .gitignore so auto_init can commit
+    (path / ".gitignore").write_text(".session\nlogs/\n")
+    GitManager(state_dir=path).auto_init()
+    return path
 
 
 @pytest.fixture
-def git_repo(tmp_path):
+def git_repo(tmp_path, _initialised_repo):
     """Create a GitManager with a real git repo in a temp dir."""
+    # A plain copy, not hard links: tests rewrite worktree files in place
+    shutil.copytree(_initialised_repo, tmp_path, dirs_exist_ok=True)
     gm = GitManager(state_dir=tmp_path)
-    # Create .gitignore so auto_init can commit
-    (tmp_path / ".gitignore").write_text(".session\nlogs/\n")
     gm.auto_init()
     return gm
 
 
+# ------------------------------------------------------------------
+# GitManager.commit
+# ------------------------------------------------------------------
+
+class TestGitCommit:
+    def test_auto_init_reuses_open_repo(self, git_repo):
+        with patch("dnsctl.core.git_manager.Repo") as repo_cls:
+            assert git_repo.auto_init() is git_repo.repo
+        repo_cls.assert_not_called()
+
+    def test_get_git_manager_shares_one_manager_per_dir(self, tmp_path):
+        assert get_git_manager(tmp_path / "a") is get_git_manager(tmp_path / "a")
+        assert get_git_manager(tmp_path / "a") is not get_git_manager(tmp_path / "b")
+
+    def test_auto_init_reopens_after_git_dir_removed(self, git_repo, tmp_path):
+        (tmp_path / "data.txt").write_text("v1")
+        git_repo.commit("v1")
+        shutil.rmtree(tmp_path / ".git")
+        assert git_repo.auto_init().git_dir == str(tmp_path / ".git")
+        assert [c["title"] for c in git_repo.log()] == ["Initial dnsctl state"]
+
+    def test_removed_account_gets_a_fresh_manager(self, tmp_state):
+        account_dir = state_manager.ACCOUNTS_DIR / "gone"
+        old = get_git_manager(account_dir)
+        state_manager.remove_account("gone")
+        assert get_git_manager(account_dir) is not old
+        forget_git_manager(account_dir)  # unknown dirs are ignored
+        forget_git_manager(account_dir)
+
+    def test_commit_without_changes_returns_none(self, git_repo, tmp_path):
+        (tmp_path / "data.txt").write_text("v1")
+        assert git_repo.commit("v1") is not None
+        assert git_repo.commit("again") is None
+
+    def test_commit_picks_up_deletions(self, git_repo, tmp_path):
+        (tmp_path / "data.txt").write_text("v1")
+        git_repo.commit("v1")
+        (tmp_path / "data.txt").unlink()
+        assert git_repo.commit("remove") is not None
+
+    def test_log_keeps_multiline_messages(self, git_repo, tmp_path):
+        (tmp_path / "data.txt").write_text("v1")
+        sha = git_repo.commit("Subject line\n\nbody one\n  body two")
+        entry = git_repo.log(max_count=1)[0]
+        assert entry["sha"] == sha
+        assert entry["short_sha"] == sha[:8]
+        assert entry["title"] == "Subject line"
+        assert entry["message"] == "Subject line\n\nbody one\n  body two"
+        assert entry["author"] == "dnsctl"
+        assert len(git_repo.log()) == 2
+
+    def test_deferred_changes_commit_once(self, git_repo, tmp_path):
+        for i in range(3):
+            (tmp_path / f"rec{i}.txt").write_text("x")
+            git_repo.defer(f"Add rec{i}\n\ndetail {i}")
+        assert len(git_repo.log()) == 1
+        assert git_repo.commit_pending() is not None
+        entry = git_repo.log(max_count=1)[0]
+        assert entry["title"] == "Batch of 3 changes"
+        assert "- Add rec2" in entry["message"]
+        assert len(git_repo.log()) == 2
+        assert git_repo.pending_messages() == []
+        assert git_repo.commit_pending() is None
+
+    def test_ordinary_commit_records_deferred_messages(self, git_repo, tmp_path):
+        (tmp_path / "edit.txt").write_text("x")
+        git_repo.defer("Edit record")
+        (tmp_path / "sync.txt").write_text("y")
+        git_repo.commit("Sync zones")
+        entry = git_repo.log(max_count=1)[0]
+        assert entry["title"] == "Sync zones"
+        assert "- Edit record" in entry["message"]
+        assert git_repo.pending_messages() == []
+        assert git_repo.commit_pending() is None
+
+    def test_rollback_commits_deferred_edits_first(self, git_repo, tmp_path):
+        (tmp_path / "data.txt").write_text("v1")
+        sha1 = git_repo.commit("v1")
+        (tmp_path / "data.txt").write_text("v2")
+        git_repo.defer("Edit to v2")
+        git_repo.rollback(sha1)
+        titles = [c["title"] for c in git_repo.log()]
+        assert titles[:2] == [f"Rollback to {sha1[:8]}", "Edit to v2"]
+        assert git_repo.pending_messages() == []
+
+    def test_commits_from_several_threads_are_serialized(self, git_repo, tmp_path):
+        from concurrent.futures import ThreadPoolExecutor
+
+        def edit(i):
+            (tmp_path / f"rec{i}.txt").write_text("x")
+            return git_repo.commit(f"Add rec{i}")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(edit, range(8)))
+        assert len(git_repo.log()) > 1
+        assert not git_repo.repo.is_dirty(untracked_files=True)
+
+    def test_queueing_does_not_wait_on_a_running_commit(self, git_repo):
+        import threading
+
+        held, release = threading.Event(), threading.Event()
+
+        def commit_in_progress():
+            with git_repo._lock:
+                held.set()
+                release.wait(5)
+
+        worker = threading.Thread(target=commit_in_progress)
+        worker.start()
+        held.wait(5)
+        try:
+            git_repo.defer("Edit record")
+            assert git_repo.pending_messages() == ["Edit record"]
+        finally:
+            release.set()
+            worker.join()
+
+    def test_commit_waits_for_deferred_edit_being_written(self, git_repo, tmp_path):
+        import threading
+
+        with git_repo.deferring("Add late"):
+            worker = threading.Thread(target=git_repo.commit_pending)
+            worker.start()
+            worker.join(0.2)
+            assert worker.is_alive()
+            (tmp_path / "late.txt").write_text("x")
+        worker.join(5)
+        head = git_repo.repo.head.commit
+        assert head.message.startswith("Add late")
+        assert "late.txt" in head.stats.files
+        assert git_repo.pending_messages() == []
+
 # ------------------------------------------------------------------
 # GitManager.rollback
 # ------------------------------------------------------------------
@@ -135,6 +256,28 @@ class TestShowFileAt:
 
         assert git_repo.show_file_at(sha1, "data.txt") == "old"
 
+    def test_show_files_at_reads_several_paths(self, git_repo, tmp_path):
+        (tmp_path / "zones").mkdir()
+        (tmp_path / "zones" / "a.json").write_text("A")
+        (tmp_path / "zones" / "b.json").write_text("B")
+        sha = git_repo.commit("zones")
+
+        assert git_repo.show_files_at(sha, ["zones/a.json", "zones/b.json", "zones/c.json"]) == {
+            "zones/a.json": "A", "zones/b.json": "B", "zones/c.json": None,
+        }
+        assert git_repo.show_files_at("nonexistent_sha", ["zones/a.json"]) == {"zones/a.json": None}
+
+    def test_show_files_at_remembers_contents(self, git_repo, tmp_path):
+        (tmp_path / "data.txt").write_text("v1")
+        sha = git_repo.commit("v1")
+        assert git_repo.show_file_at(sha, "data.txt") == "v1"
+        (tmp_path / "data.txt").write_text("v2")
+        git_repo.commit("v2")
+
+        with patch("git.objects.commit.Commit.tree", new_callable=PropertyMock) as tree:
+            assert git_repo.show_file_at(sha, "data.txt") == "v1"
+        tree.assert_not_called()
+
 
 # ------------------------------------------------------------------
 # Export / Import
@@ -156,6 +299,23 @@ class TestExport:
         assert data["zone_id"] == "z1"
         assert len(data["records"]) == 1
 
+    def test_export_writes_through_existing_file(self, tmp_state):
+        import os
+
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        state_manager.save_zone("z1", "x.com", [], _ALIAS)
+        target = tmp_state / "shared.json"
+        target.write_text("old")
+        target.chmod(0o644)
+        link = tmp_state / "export.json"
+        link.symlink_to(target)
+
+        state_manager.export_zone("x.com", link, _ALIAS)
+        assert link.is_symlink()
+        assert json.loads(target.read_text())["zone_name"] == "x.com"
+        assert os.stat(target).st_mode & 0o777 == 0o644
+
     def test_export_nonexistent_zone_raises(self, tmp_state):
         with patch("dnsctl.core.state_manager._migrate_legacy"):
             state_manager.init_state_dir()
@@ -216,6 +376,28 @@ class TestImport:
         with pytest.raises(ValueError, match="must be a list"):
             state_manager.import_zone(src, _ALIAS)
 
+    def test_import_non_object_raises(self, tmp_state):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        src = tmp_state / "list.json"
+        src.write_text("[]")
+
+        with pytest.raises(ValueError, match="JSON object"):
+            state_manager.import_zone(src, _ALIAS)
+
+    def test_import_oversized_file_rejected_before_parse(self, tmp_state):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        src = tmp_state / "big.json"
+        src.write_text(json.dumps({"zone_id": "z1", "zone_name": "x.com", "records": []}))
+
+        with patch("dnsctl.core.state_manager.IMPORT_MAX_BYTES", 10), \
+             patch("dnsctl.core.state_manager.serialization.loads") as loads:
+            with pytest.raises(ValueError, match="limit") as excinfo:
+                state_manager.import_zone(src, _ALIAS)
+        loads.assert_not_called()
+        assert str(excinfo.value).startswith("Import file is ")
+
     def test_roundtrip_export_import(self, tmp_state):
         with patch("dnsctl.core.state_manager._migrate_legacy"):
             state_manager.init_state_dir()
@@ -11,32 +11,6 @@ from dnsctl.core import state_manager
 from dnsctl.core.cloudflare_client import CloudflareClient, CloudflareAPIError
 
 
-# ------------------------------------------------------------------
-# Fixtures
-# ------------------------------------------------------------------
-
-@pytest.fixture
-def tmp_state(tmp_path):
-    """Patch all state directory paths to a temp dir for isolation."""
-    accounts_dir = tmp_path / "accounts"
-    accounts_file = tmp_path / "accounts.json"
-    logs = tmp_path / "logs"
-    metadata = tmp_path / "metadata.json"
-    config = tmp_path / "config.json"
-
-    with patch.multiple(
-        "dnsctl.core.state_manager",
-        STATE_DIR=tmp_path,
-        ACCOUNTS_DIR=accounts_dir,
-        ACCOUNTS_FILE=accounts_file,
-        LOGS_DIR=logs,
-        METADATA_FILE=metadata,
-        CONFIG_FILE=config,
-        _LEGACY_ZONES_DIR=tmp_path / "zones",
-    ):
-        yield tmp_path
-
-
 # ------------------------------------------------------------------
 # Protected records management
 # ------------------------------------------------------------------
@@ -89,6 +63,17 @@ class TestProtectedRecords:
         assert len(loaded) == 1
         assert loaded[0]["type"] == "A"
 
+    def test_load_parses_once_until_file_changes(self, tmp_state):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        state_manager.add_protected_record("A", "example.com", "Prod")
+        with patch("dnsctl.core.state_manager.serialization.loads") as loads:
+            state_manager.load_protected_records().append({"type": "MX"})
+            assert len(state_manager.load_protected_records()) == 1
+        loads.assert_not_called()
+        (tmp_state / "metadata.json").write_text(json.dumps({"protected_records": []}))
+        assert state_manager.load_protected_records() == []
+
     def test_load_corrupted_metadata_returns_empty(self, tmp_state):
         with patch("dnsctl.core.state_manager._migrate_legacy"):
             state_manager.init_state_dir()
@@ -113,33 +98,48 @@ class TestProtectedRecords:
 # Connection error handling
 # ------------------------------------------------------------------
 
-class TestConnectionErrorHandling:
-    def test_connection_error_retries_then_raises(self):
-        client = CloudflareClient()
-        with patch.object(client._session, "request",
-                          side_effect=requests.ConnectionError("network down")):
-            with patch("dnsctl.core.cloudflare_client.time.sleep"):
-                with pytest.raises(CloudflareAPIError, match="Connection failed"):
-                    client._request("GET", "/test", "fake-token")
+def _ok_response() -> MagicMock:
+    resp = MagicMock()
+    resp.status_code = 200
+    resp.content = json.dumps({"success": True, "result": []}).encode()
+    return resp
+
 
-    def test_timeout_error_retries_then_raises(self):
+class TestConnectionErrorHandling:
+    @pytest.mark.parametrize("error, message", [
+        (requests.ConnectionError("network down"), "Connection failed"),
+        (requests.Timeout("timed out"), "timed out"),
+    ], ids=["connection-error", "timeout"])
+    def test_error_retries_then_raises(self, error, message):
         client = CloudflareClient()
-        with patch.object(client._session, "request",
-                          side_effect=requests.Timeout("timed out")):
-            with patch("dnsctl.core.cloudflare_client.time.sleep"):
-                with pytest.raises(CloudflareAPIError, match="timed out"):
-                    client._request("GET", "/test", "fake-token")
+        with patch.object(client._session, "request", side_effect=error), \
+             patch("dnsctl.core.cloudflare_client.time.sleep"):
+            with pytest.raises(CloudflareAPIError, match=message):
+                client._request("GET", "/test", "fake-token")
 
     def test_connection_error_recovers_on_retry(self):
         client = CloudflareClient()
-        ok_resp = MagicMock()
-        ok_resp.status_code = 200
-        ok_resp.json.return_value = {"success": True, "result": []}
-
         with patch.object(
             client._session, "request",
-            side_effect=[requests.ConnectionError("down"), ok_resp]
+            side_effect=[requests.ConnectionError("down"), _ok_response()]
         ):
             with patch("dnsctl.core.cloudflare_client.time.sleep"):
                 result = client._request("GET", "/test", "fake-token")
                 assert result["success"] is True
+
+    def test_rate_limit_backoff_is_jittered_and_honours_retry_after(self):
+        client = CloudflareClient()
+        limited = MagicMock()
+        limited.status_code = 429
+        limited.headers = {}
+        slow = MagicMock()
+        slow.status_code = 429
+        slow.headers = {"Retry-After": "120"}
+
+        with patch.object(client._session, "request",
+                          side_effect=[limited, limited, limited, slow, _ok_response()]):
+            with patch("dnsctl.core.cloudflare_client.time.sleep") as sleep, \
+                 patch("dnsctl.core.cloudflare_client.random.random", return_value=0.0):
+                client._request("GET", "/test", "fake-token")
+        waits = [c.args[0] for c in sleep.call_args_list]
+        assert waits == [0.5, 1.0, 2.0, 120.0]
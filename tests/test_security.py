@@ -1,13 +1,20 @@
 """Tests for core.security — encryption roundtrip and session management."""
 
+import base64
+import json
+import os
 import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from dnsctl.core import security
 from dnsctl.core.security import (
     _decrypt_token,
     _encrypt_token,
+    decrypt_with_key,
+    derive_key_from_password,
+    encrypt_with_key,
     get_token,
     is_logged_in,
     lock,
@@ -19,6 +26,16 @@ from dnsctl.core.security import (
 _ALIAS = "test_acct"
 
 
+@pytest.fixture(autouse=True)
+def cheap_kdf():
+    """Use minimal KDF costs; blobs carry their parameters, so the code
+    paths are the same as with the production settings."""
+    with patch.multiple(security,
+                        _DEFAULT_KDF=("argon2id", 1, 8, 1),
+                        _LEGACY_KDF=("pbkdf2", 1_000)):
+        yield
+
+
 class TestEncryptionRoundtrip:
     def test_roundtrip_succeeds(self):
         token = "my-secret-cloudflare-token"
@@ -38,6 +55,98 @@ class TestEncryptionRoundtrip:
         b2 = _encrypt_token(token, "pass2___")
         assert b1 != b2
 
+    def test_legacy_json_blob_still_decrypts(self):
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+        salt, nonce = os.urandom(16), os.urandom(12)
+        key = derive_key_from_password("legacy-password", salt, security._LEGACY_KDF)
+        ct = AESGCM(key).encrypt(nonce, b"old-token", None)
+        legacy = base64.b64encode(json.dumps({
+            "salt": base64.b64encode(salt).decode(),
+            "nonce": base64.b64encode(nonce).decode(),
+            "ct": base64.b64encode(ct).decode(),
+        }).encode()).decode()
+        assert _decrypt_token(legacy, "legacy-password") == "old-token"
+
+
+class TestDerivedKeys:
+    def test_key_roundtrip(self):
+        key = derive_key_from_password("strongpassword", b"\x00" * 16)
+        blob = encrypt_with_key(key, "tok-a")
+        assert decrypt_with_key(key, blob) == "tok-a"
+
+    def test_decrypt_with_key_accepts_full_blob(self):
+        blob = _encrypt_token("tok-b", "strongpassword")
+        salt = security._decode_blob(blob)[1]
+        key = derive_key_from_password("strongpassword", salt)
+        assert decrypt_with_key(key, blob) == "tok-b"
+
+    def test_each_encryption_gets_a_fresh_salt(self):
+        b1 = _encrypt_token("tok", "shared-password")
+        b2 = _encrypt_token("tok", "shared-password")
+        assert security._decode_blob(b1)[1] != security._decode_blob(b2)[1]
+
+    def test_same_blob_derives_once(self):
+        blob = _encrypt_token("tok1", "shared-password")
+        security._derived_keys.clear()
+        with patch("dnsctl.core.security.derive_key_from_password",
+                   wraps=derive_key_from_password) as derive:
+            assert _decrypt_token(blob, "shared-password") == "tok1"
+            assert _decrypt_token(blob, "shared-password") == "tok1"
+        assert derive.call_count == 1
+
+    def test_wrong_password_not_cached(self):
+        blob = _encrypt_token("tok", "correct-password")
+        with pytest.raises(Exception):
+            _decrypt_token(blob, "wrong-password")
+        assert not any(k[0] == "wrong-password" for k in security._derived_keys)
+
+    @patch("dnsctl.core.security.keyring")
+    def test_lock_evicts_only_that_accounts_key(self, mock_kr, tmp_path):
+        mock_kr.errors = MagicMock()
+        mock_kr.errors.PasswordDeleteError = Exception
+        blobs = {a: _encrypt_token(f"tok-{a}", "shared-password") for a in ("a1", "a2")}
+        mock_kr.get_password.side_effect = lambda service, alias: blobs.get(alias)
+        security._derived_keys.clear()
+        with patch("dnsctl.core.security._account_session_file",
+                   side_effect=lambda alias: tmp_path / alias / ".session"):
+            unlock("shared-password", "a1")
+            unlock("shared-password", "a2")
+            assert len(security._derived_keys) == 2
+            lock("a1")
+        salt_a2 = security._decode_blob(blobs["a2"])[1]
+        assert [k[1] for k in security._derived_keys] == [salt_a2]
+
+
+class TestKdfUpgrade:
+    def test_new_blobs_use_argon2id(self):
+        blob = _encrypt_token("tok", "strongpassword")
+        kdf, *_ = security._decode_blob(blob)
+        assert kdf == security._DEFAULT_KDF
+        assert not security._needs_rehash(blob)
+
+    @patch("dnsctl.core.security.keyring")
+    def test_unlock_rewrites_pbkdf2_blob(self, mock_kr, tmp_path):
+        salt = os.urandom(16)
+        key = derive_key_from_password("pw-legacy", salt, security._LEGACY_KDF)
+        nonce = os.urandom(12)
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        ct = AESGCM(key).encrypt(nonce, b"tok", None)
+        legacy = base64.b64encode(json.dumps({
+            "salt": base64.b64encode(salt).decode(),
+            "nonce": base64.b64encode(nonce).decode(),
+            "ct": base64.b64encode(ct).decode(),
+        }).encode()).decode()
+        mock_kr.get_password.return_value = legacy
+        with patch("dnsctl.core.security._account_session_file",
+                   return_value=tmp_path / ".session"):
+            assert unlock("pw-legacy", _ALIAS) == "tok"
+        stored = [c.args for c in mock_kr.set_password.call_args_list
+                  if c.args[0] == "dnsctl_encrypted_token"]
+        assert len(stored) == 1
+        assert _decrypt_token(stored[0][2], "pw-legacy") == "tok"
+        assert not security._needs_rehash(stored[0][2])
+
 
 class TestLoginUnlock:
     @patch("dnsctl.core.security.keyring")
@@ -80,3 +189,56 @@ class TestSession:
                    return_value=session_file):
             lock(_ALIAS)
         assert not session_file.exists()
+
+    @patch("dnsctl.core.security.keyring")
+    def test_get_token_reads_keyring_once(self, mock_kr, tmp_path):
+        mock_kr.errors = MagicMock()
+        mock_kr.errors.PasswordDeleteError = Exception
+        mock_kr.get_password.return_value = "tok"
+        session_file = tmp_path / ".session"
+        session_file.write_text(str(time.time()))
+        with patch("dnsctl.core.security._account_session_file",
+                   return_value=session_file):
+            assert get_token(_ALIAS) == "tok"
+            assert get_token(_ALIAS) == "tok"
+            assert mock_kr.get_password.call_count == 1
+
+            # A lock (from any process) removes the session file
+            lock(_ALIAS)
+            assert get_token(_ALIAS) is None
+
+    @patch("dnsctl.core.security.keyring")
+    def test_new_session_from_another_process_rereads_keyring(self, mock_kr, tmp_path):
+        mock_kr.get_password.return_value = "old-tok"
+        session_file = tmp_path / ".session"
+        session_file.write_text(str(time.time()))
+        with patch("dnsctl.core.security._account_session_file",
+                   return_value=session_file):
+            assert get_token(_ALIAS) == "old-tok"
+
+            # Another process locks and unlocks again with a new token
+            mock_kr.get_password.return_value = "new-tok"
+            fresh = tmp_path / ".session.new"
+            fresh.write_text(str(time.time()))
+            os.replace(fresh, session_file)
+            assert get_token(_ALIAS) == "new-tok"
+
+            # Locked elsewhere while unobserved: the token is forgotten too
+            session_file.unlink()
+            assert get_token(_ALIAS) is None
+            assert _ALIAS not in security._token_cache
+
+    @patch("dnsctl.core.security.keyring")
+    def test_get_token_refreshes_only_stale_timestamp(self, mock_kr, tmp_path):
+        mock_kr.get_password.return_value = "tok"
+        session_file = tmp_path / ".session"
+        with patch("dnsctl.core.security._account_session_file",
+                   return_value=session_file), \
+             patch("dnsctl.core.security._touch_session") as touch:
+            session_file.write_text(str(time.time()))
+            get_token(_ALIAS)
+            touch.assert_not_called()
+
+            session_file.write_text(str(time.time() - 300))
+            get_token(_ALIAS)
+            touch.assert_called_once_with(_ALIAS)
@@ -0,0 +1,48 @@
+"""Tests for core.serialization — orjson / stdlib JSON parity."""
+
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from dnsctl.core import serialization
+
+_DOC = {
+    "zone_name": "example.com",
+    "records": [
+        {"id": "r1", "type": "TXT", "name": "x.com", "content": "café — ok", "ttl": 1},
+        {"id": "r2", "type": "MX", "name": "x.com", "content": "mx.x.com", "priority": 10, "data": {}},
+    ],
+    "empty": [],
+}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+        yield
+    else:
+        with patch.object(serialization, "orjson", None):
+            yield
+
+
+class TestSerialization:
+    def test_roundtrip(self, backend):
+        assert serialization.loads(serialization.dumps(_DOC)) == _DOC
+        assert serialization.loads(serialization.dumps(_DOC, indent=True).decode()) == _DOC
+
+    def test_indent_matches_stdlib_layout(self, backend):
+        expected = json.dumps(_DOC, indent=2, ensure_ascii=False).encode("utf-8")
+        assert serialization.dumps(_DOC, indent=True) == expected
+
+    def test_compact_has_no_whitespace(self, backend):
+        assert serialization.dumps({"a": [1, 2]}) == b'{"a":[1,2]}'
+
+    def test_dump_matches_dumps(self, backend):
+        for indent in (True, False):
+            buf = io.BytesIO()
+            serialization.dump(_DOC, buf, indent=indent)
+            assert buf.getvalue() == serialization.dumps(_DOC, indent=indent)
+            assert not buf.closed
@@ -1,6 +1,8 @@
 """Tests for core.state_manager — state directory init, zone save/load, hashing."""
 
+import hashlib
 import json
+import os
 import tempfile
 from pathlib import Path
 from unittest.mock import patch
@@ -12,28 +14,6 @@ from dnsctl.core import state_manager
 _ALIAS = "test"
 
 
-@pytest.fixture
-def tmp_state(tmp_path):
-    """Patch all state directory paths to a temp dir for isolation."""
-    accounts_dir = tmp_path / "accounts"
-    accounts_file = tmp_path / "accounts.json"
-    logs = tmp_path / "logs"
-    metadata = tmp_path / "metadata.json"
-    config = tmp_path / "config.json"
-
-    with patch.multiple(
-        "dnsctl.core.state_manager",
-        STATE_DIR=tmp_path,
-        ACCOUNTS_DIR=accounts_dir,
-        ACCOUNTS_FILE=accounts_file,
-        LOGS_DIR=logs,
-        METADATA_FILE=metadata,
-        CONFIG_FILE=config,
-        _LEGACY_ZONES_DIR=tmp_path / "zones",
-    ):
-        yield tmp_path
-
-
 class TestInitStateDir:
     def test_creates_directories_and_files(self, tmp_state):
         # Prevent migration from hitting real keyring
@@ -82,6 +62,172 @@ class TestZonePersistence:
         zones = state_manager.list_synced_zones(_ALIAS)
         assert zones == ["alpha.com", "beta.com"]
 
+    def test_unchanged_save_does_not_reparse(self, tmp_state):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        records = [{"id": "r1", "type": "A", "name": "x.com", "content": "1.2.3.4"}]
+        first = state_manager.save_zone("z1", "x.com", records, _ALIAS)
+        with patch("dnsctl.core.state_manager.serialization.loads") as loads:
+            again = state_manager.save_zone("z1", "x.com", records, _ALIAS)
+        loads.assert_not_called()
+        assert again == first
+
+    def test_save_after_load_does_not_reparse(self, tmp_state):
+        # The CLI edit commands load a zone, mutate it, then save it
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        records = [{"id": "r1", "type": "A", "name": "x.com", "content": "1.2.3.4"}]
+        state_manager.save_zone("z1", "x.com", records, _ALIAS)
+        state_manager._zone_headers.clear()
+        state = state_manager.load_zone("x.com", _ALIAS)
+        state["records"].append({"type": "A", "name": "y.x.com", "content": "5.6.7.8"})
+        with patch("dnsctl.core.state_manager.serialization.loads") as loads:
+            state_manager.save_zone(state["zone_id"], "x.com", state["records"], _ALIAS)
+        loads.assert_not_called()
+
+    def test_external_rewrite_invalidates_cached_header(self, tmp_state):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        records = [{"id": "r1", "type": "A", "name": "x.com", "content": "1.2.3.4"}]
+        first = state_manager.save_zone("z1", "x.com", records, _ALIAS)
+        path = state_manager._zone_path("x.com", _ALIAS)
+        tampered = dict(first, state_hash="0" * 32, zone_id="zz")
+        path.write_text(json.dumps(tampered, indent=2))
+
+        # The edited file is re-read, its hash mismatches, so it is rewritten
+        state_manager.save_zone("z1", "x.com", records, _ALIAS)
+        assert state_manager.load_zone("x.com", _ALIAS)["state_hash"] == first["state_hash"]
+
+    @pytest.mark.parametrize("records", [
+        [],
+        [{"id": "r1", "type": "A", "name": "x.com", "content": "1.2.3.4"}],
+    ], ids=["empty", "records"])
+    def test_load_zone_header(self, tmp_state, records):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        assert state_manager.load_zone_header("x.com", _ALIAS) is None
+        state = state_manager.save_zone("z1", "x.com", records, _ALIAS, remote_marker="3:2024-01-01T00:00:00Z")
+        header = {k: v for k, v in state.items() if k != "records"}
+        state_manager._zone_headers.clear()
+        assert state_manager.load_zone_header("x.com", _ALIAS) == header
+
+        # Files written with indent=2 by older releases are parsed whole
+        state_manager._zone_path("x.com", _ALIAS).write_text(json.dumps(state, indent=2))
+        assert state_manager.load_zone_header("x.com", _ALIAS) == header
+
+    def test_load_all_zones(self, tmp_state):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        assert state_manager.load_all_zones(_ALIAS) == {}
+        state_manager.save_zone("z2", "beta.com", [], _ALIAS)
+        state_manager.save_zone("z1", "alpha.com", [], _ALIAS)
+        states = state_manager.load_all_zones(_ALIAS)
+        assert list(states) == state_manager.list_synced_zones(_ALIAS)
+        assert states["alpha.com"] == state_manager.load_zone("alpha.com", _ALIAS)
+
+    def test_remote_marker_recorded_and_dropped_by_local_edit(self, tmp_state):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        records = [{"id": "r1", "type": "A", "name": "x.com", "content": "1.2.3.4"}]
+        state_manager.save_zone("z1", "x.com", records, _ALIAS, remote_marker="3:2024-01-01T00:00:00Z")
+        assert state_manager.load_zone("x.com", _ALIAS)["remote_marker"] == "3:2024-01-01T00:00:00Z"
+
+        # Same records, no marker → file left alone
+        state_manager.save_zone("z1", "x.com", records, _ALIAS)
+        assert state_manager.load_zone("x.com", _ALIAS)["remote_marker"] == "3:2024-01-01T00:00:00Z"
+
+        edited = [dict(records[0], content="5.6.7.8")]
+        state_manager.save_zone("z1", "x.com", edited, _ALIAS)
+        assert "remote_marker" not in state_manager.load_zone("x.com", _ALIAS)
+
+    def test_zone_file_has_one_record_per_line(self, tmp_state):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        records = [
+            {"id": "r1", "type": "TXT", "name": "x.com", "content": "a,\nb"},
+            {"id": "r2", "type": "A", "name": "y.x.com", "content": "1.2.3.4"},
+        ]
+        state = state_manager.save_zone("z1", "x.com", records, _ALIAS)
+        lines = state_manager._zone_path("x.com", _ALIAS).read_text().splitlines()
+        assert len(lines) == 4
+        assert lines[0].startswith('{"zone_id":"z1"')
+        assert json.loads(lines[2]) == records[1]
+        assert state_manager.load_zone("x.com", _ALIAS) == state
+
+        state_manager.save_zone("z1", "x.com", [], _ALIAS)
+        assert state_manager.load_zone("x.com", _ALIAS)["records"] == []
+
+    def test_failed_write_keeps_previous_file(self, tmp_state):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        records = [{"id": "r1", "type": "A", "name": "x.com", "content": "1.2.3.4"}]
+        state_manager.save_zone("z1", "x.com", records, _ALIAS)
+        edited = [dict(records[0], content="5.6.7.8")]
+        with patch("dnsctl.core.state_manager.os.replace", side_effect=KeyboardInterrupt):
+            with pytest.raises(KeyboardInterrupt):
+                state_manager.save_zone("z1", "x.com", edited, _ALIAS)
+        assert state_manager.load_zone("x.com", _ALIAS)["records"] == records
+        zones_dir = state_manager.get_account_zones_dir(_ALIAS)
+        assert [p.name for p in zones_dir.iterdir()] == ["x.com.json"]
+
+    def test_concurrent_writers_use_separate_temp_files(self, tmp_state):
+        path = tmp_state / "data.json"
+        with patch("dnsctl.core.state_manager.os.fsync") as fsync:
+            with state_manager._atomic_open(path) as first:
+                first.write(b"first")
+                with state_manager._atomic_open(path) as second:
+                    second.write(b"second")
+                assert path.read_bytes() == b"second"
+        assert path.read_bytes() == b"first"
+        assert fsync.call_count == 2
+        assert [p.name for p in tmp_state.iterdir()] == ["data.json"]
+
+
+class TestAccounts:
+    def test_add_account_round_trip(self, tmp_state):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        state_manager.add_account("work", "Büro")
+        state_manager.add_account("work", "Büro")  # already registered
+        assert state_manager.list_accounts() == [{"alias": "work", "label": "Büro"}]
+        assert (tmp_state / "accounts" / "work" / "zones").is_dir()
+
+    def test_corrupt_accounts_file_reads_as_empty(self, tmp_state):
+        (tmp_state / "accounts.json").write_text("{not json")
+        assert state_manager.list_accounts() == []
+
+
+class TestConfig:
+    def test_get_config_parses_once(self, tmp_state):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        state_manager.set_config("default_account", "work")
+        with patch("dnsctl.core.state_manager.serialization.loads") as loads:
+            assert state_manager.get_config() == {"default_account": "work"}
+            assert state_manager.get_config() == {"default_account": "work"}
+        loads.assert_not_called()
+
+    def test_external_edit_is_picked_up(self, tmp_state):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        state_manager.set_config("a", 1)
+        state_manager.get_config()["a"] = 99  # callers get a copy
+        assert state_manager.get_config() == {"a": 1}
+        (tmp_state / "config.json").write_text(json.dumps({"a": 1, "bb": 2}))
+        assert state_manager.get_config() == {"a": 1, "bb": 2}
+
+    def test_same_size_replace_in_same_tick_is_picked_up(self, tmp_state):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        state_manager.set_config("a", 1)
+        config = tmp_state / "config.json"
+        st = config.stat()
+        new = tmp_state / "config.new"
+        new.write_bytes(config.read_bytes().replace(b"1", b"2"))
+        os.utime(new, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(new, config)
+        assert state_manager.get_config() == {"a": 2}
+
 
 class TestHash:
     def test_deterministic(self):
@@ -94,3 +240,31 @@ class TestHash:
         r1 = [{"type": "A", "name": "x.com", "content": "1.2.3.4"}]
         r2 = [{"type": "A", "name": "x.com", "content": "5.6.7.8"}]
         assert state_manager._compute_hash(r1) != state_manager._compute_hash(r2)
+
+    def test_order_independent(self):
+        a = {"type": "A", "name": "a.x.com", "content": "1.2.3.4"}
+        b = {"type": "A", "name": "b.x.com", "content": "1.2.3.4"}
+        assert state_manager._compute_hash([a, b]) == state_manager._compute_hash([b, a])
+
+    @pytest.mark.parametrize("n", [0, 1, 512, 1300])
+    def test_chunked_matches_full_canonical_json(self, n):
+        records = [{"type": "A", "name": f"h{i}.x.com", "content": "1.2.3.4", "ttl": 1}
+                   for i in range(n)]
+        canonical = json.dumps(sorted(records, key=lambda r: r["name"]),
+                               sort_keys=True, separators=(",", ":"))
+        expected = hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+        assert state_manager._compute_hash(records) == expected
+
+    def test_legacy_sha256_hash_still_matches(self, tmp_state):
+        with patch("dnsctl.core.state_manager._migrate_legacy"):
+            state_manager.init_state_dir()
+        records = [{"id": "r1", "type": "A", "name": "x.com", "content": "1.2.3.4"}]
+        state_manager.save_zone("z1", "x.com", records, _ALIAS)
+        path = state_manager._zone_path("x.com", _ALIAS)
+        state = json.loads(path.read_text())
+        canonical = json.dumps(records, sort_keys=True, separators=(",", ":"))
+        state["state_hash"] = hashlib.sha256(canonical.encode()).hexdigest()
+        path.write_text(json.dumps(state, indent=2))
+
+        # Unchanged records → old file kept as-is
+        assert state_manager.save_zone("z1", "x.com", records, _ALIAS) == state
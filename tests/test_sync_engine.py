@@ -1,9 +1,12 @@
 """Tests for core.sync_engine — plan generation and application."""
 
+from dataclasses import replace
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from dnsctl.config import PLAN_SNAPSHOT_MAX_AGE_SECONDS
+from dnsctl.core.cloudflare_client import CloudflareAPIError, CloudflareClient
 from dnsctl.core.sync_engine import SyncEngine, Plan, PlanAction, ApplyResult
 
 
@@ -19,12 +22,12 @@ def _sample_records():
 # ------------------------------------------------------------------
 
 class TestDetectDrift:
-    @patch("dnsctl.core.sync_engine.CloudflareClient")
+    @patch("dnsctl.core.sync_engine.get_client")
     @patch("dnsctl.core.sync_engine.load_zone")
     def test_clean_no_drift(self, mock_load, mock_cf_cls):
         records = _sample_records()
         mock_load.return_value = {"zone_id": "z1", "records": records}
-        mock_cf = MagicMock()
+        mock_cf = MagicMock(spec=CloudflareClient)
         mock_cf_cls.return_value = mock_cf
         mock_cf.list_records.return_value = list(records)
 
@@ -33,7 +36,7 @@ class TestDetectDrift:
         assert drift is not None
         assert not drift.has_changes
 
-    @patch("dnsctl.core.sync_engine.CloudflareClient")
+    @patch("dnsctl.core.sync_engine.get_client")
     @patch("dnsctl.core.sync_engine.load_zone")
     def test_drift_with_remote_addition(self, mock_load, mock_cf_cls):
         records = _sample_records()
@@ -42,7 +45,7 @@ class TestDetectDrift:
         remote = list(records) + [
             {"id": "r3", "type": "A", "name": "new.x.com", "content": "5.6.7.8", "ttl": 300, "proxied": False},
         ]
-        mock_cf = MagicMock()
+        mock_cf = MagicMock(spec=CloudflareClient)
         mock_cf_cls.return_value = mock_cf
         mock_cf.list_records.return_value = remote
 
@@ -52,7 +55,7 @@ class TestDetectDrift:
         assert drift.has_changes
         assert len(drift.added) == 1
 
-    @patch("dnsctl.core.sync_engine.CloudflareClient")
+    @patch("dnsctl.core.sync_engine.get_client")
     @patch("dnsctl.core.sync_engine.load_zone")
     def test_not_synced_returns_none(self, mock_load, mock_cf_cls):
         mock_load.return_value = None
@@ -65,12 +68,12 @@ class TestDetectDrift:
 # ------------------------------------------------------------------
 
 class TestGeneratePlan:
-    @patch("dnsctl.core.sync_engine.CloudflareClient")
+    @patch("dnsctl.core.sync_engine.get_client")
     @patch("dnsctl.core.sync_engine.load_zone")
     def test_no_changes_when_in_sync(self, mock_load, mock_cf_cls):
         records = _sample_records()
         mock_load.return_value = {"zone_id": "z1", "records": records}
-        mock_cf = MagicMock()
+        mock_cf = MagicMock(spec=CloudflareClient)
         mock_cf_cls.return_value = mock_cf
         mock_cf.list_records.return_value = list(records)
 
@@ -78,7 +81,7 @@ class TestGeneratePlan:
         plan = engine.generate_plan("x.com", "token")
         assert not plan.has_changes
 
-    @patch("dnsctl.core.sync_engine.CloudflareClient")
+    @patch("dnsctl.core.sync_engine.get_client")
     @patch("dnsctl.core.sync_engine.load_zone")
     def test_plan_detects_delete_for_remote_addition(self, mock_load, mock_cf_cls):
         """Remote has extra record → plan includes DELETE to match local."""
@@ -88,7 +91,7 @@ class TestGeneratePlan:
         remote = list(records) + [
             {"id": "r3", "type": "A", "name": "extra.x.com", "content": "9.9.9.9", "ttl": 300, "proxied": False},
         ]
-        mock_cf = MagicMock()
+        mock_cf = MagicMock(spec=CloudflareClient)
         mock_cf_cls.return_value = mock_cf
         mock_cf.list_records.return_value = remote
 
@@ -99,7 +102,7 @@ class TestGeneratePlan:
         assert len(deletes) == 1
         assert deletes[0].record["name"] == "extra.x.com"
 
-    @patch("dnsctl.core.sync_engine.CloudflareClient")
+    @patch("dnsctl.core.sync_engine.get_client")
     @patch("dnsctl.core.sync_engine.load_zone")
     def test_not_synced_raises(self, mock_load, mock_cf_cls):
         mock_load.return_value = None
@@ -113,11 +116,11 @@ class TestGeneratePlan:
 # ------------------------------------------------------------------
 
 class TestApplyPlan:
-    @patch("dnsctl.core.sync_engine.GitManager")
+    @patch("dnsctl.core.sync_engine.get_git_manager")
     @patch("dnsctl.core.sync_engine.save_zone")
-    @patch("dnsctl.core.sync_engine.CloudflareClient")
+    @patch("dnsctl.core.sync_engine.get_client")
     def test_apply_create_calls_api(self, mock_cf_cls, mock_save, mock_git_cls):
-        mock_cf = MagicMock()
+        mock_cf = MagicMock(spec=CloudflareClient)
         mock_cf_cls.return_value = mock_cf
         mock_cf.list_records.return_value = []
         mock_git = MagicMock()
@@ -138,11 +141,11 @@ class TestApplyPlan:
         assert len(result.succeeded) == 1
         mock_cf.create_record.assert_called_once()
 
-    @patch("dnsctl.core.sync_engine.GitManager")
+    @patch("dnsctl.core.sync_engine.get_git_manager")
     @patch("dnsctl.core.sync_engine.save_zone")
-    @patch("dnsctl.core.sync_engine.CloudflareClient")
+    @patch("dnsctl.core.sync_engine.get_client")
     def test_apply_skips_protected(self, mock_cf_cls, mock_save, mock_git_cls):
-        mock_cf = MagicMock()
+        mock_cf = MagicMock(spec=CloudflareClient)
         mock_cf_cls.return_value = mock_cf
         mock_cf.list_records.return_value = []
         mock_git = MagicMock()
@@ -166,11 +169,11 @@ class TestApplyPlan:
         assert len(result.failed) == 1
         mock_cf.delete_record.assert_not_called()
 
-    @patch("dnsctl.core.sync_engine.GitManager")
+    @patch("dnsctl.core.sync_engine.get_git_manager")
     @patch("dnsctl.core.sync_engine.save_zone")
-    @patch("dnsctl.core.sync_engine.CloudflareClient")
+    @patch("dnsctl.core.sync_engine.get_client")
     def test_apply_force_overrides_protection(self, mock_cf_cls, mock_save, mock_git_cls):
-        mock_cf = MagicMock()
+        mock_cf = MagicMock(spec=CloudflareClient)
         mock_cf_cls.return_value = mock_cf
         mock_cf.list_records.return_value = []
         mock_git = MagicMock()
@@ -194,6 +197,120 @@ class TestApplyPlan:
         mock_cf.delete_record.assert_called_once()
 
 
+    @patch("dnsctl.core.sync_engine.get_git_manager")
+    @patch("dnsctl.core.sync_engine.save_zone")
+    @patch("dnsctl.core.sync_engine.get_client")
+    def test_apply_keeps_plan_order_and_same_name_sequence(self, mock_cf_cls, mock_save, mock_git_cls):
+        mock_cf = MagicMock(spec=CloudflareClient)
+        mock_cf_cls.return_value = mock_cf
+        mock_cf.list_records.return_value = []
+        # Batch rejected → per-record calls
+        mock_cf.batch_records.side_effect = CloudflareAPIError(400, [{"message": "no batch"}])
+        calls: list[tuple[str, str]] = []
+        mock_cf.create_record.side_effect = lambda t, z, rec: calls.append(("create", rec["name"]))
+        mock_cf.delete_record.side_effect = lambda t, z, rid: calls.append(("delete", rid))
+
+        actions = [
+            PlanAction(action="create", record={"type": "A", "name": f"h{i}.x.com", "content": "1.2.3.4"})
+            for i in range(10)
+        ] + [
+            PlanAction(action="delete", record={"id": "old", "type": "CNAME", "name": "h3.x.com"}),
+            PlanAction(action="delete", record={"type": "A", "name": "noid.x.com"}),
+        ]
+        plan = Plan(zone_name="x.com", zone_id="z1", actions=actions)
+
+        result = SyncEngine(alias="test").apply_plan(plan, "token")
+        assert result.succeeded == actions[:11]
+        assert result.failed == [(actions[11], "No record ID for delete")]
+        assert calls.index(("create", "h3.x.com")) < calls.index(("delete", "old"))
+
+    @patch("dnsctl.core.sync_engine.get_git_manager")
+    @patch("dnsctl.core.sync_engine.save_zone")
+    @patch("dnsctl.core.sync_engine.get_client")
+    def test_apply_batches_and_saves_snapshot_without_refetch(self, mock_cf_cls, mock_save, mock_git_cls):
+        mock_cf = MagicMock(spec=CloudflareClient)
+        mock_cf_cls.return_value = mock_cf
+        remote = _sample_records()
+        new = {"type": "A", "name": "new.x.com", "content": "5.6.7.8"}
+        changed = dict(remote[0], content="9.9.9.9")
+        mock_cf.batch_records.return_value = {"posts": [dict(new, id="r3")], "puts": [changed]}
+
+        plan = Plan(zone_name="x.com", zone_id="z1", remote=remote, actions=[
+            PlanAction(action="create", record=new),
+            PlanAction(action="update", record=changed, before=remote[0]),
+            PlanAction(action="delete", record=remote[1]),
+        ])
+        result = SyncEngine(alias="test").apply_plan(plan, "token")
+        assert result.all_succeeded
+        mock_cf.batch_records.assert_called_once_with(
+            "token", "z1", posts=[new], puts=[("r1", changed)], deletes=["r2"],
+        )
+        mock_cf.create_record.assert_not_called()
+        mock_cf.list_records.assert_not_called()
+        saved = mock_save.call_args.args[2]
+        assert saved == [changed, dict(new, id="r3")]
+
+        # A plan left open too long may have missed remote edits: fetch again
+        mock_cf.list_records.return_value = remote
+        stale = replace(plan, created_at=plan.created_at - PLAN_SNAPSHOT_MAX_AGE_SECONDS - 1)
+        SyncEngine(alias="test").apply_plan(stale, "token")
+        mock_cf.list_records.assert_called_once_with("token", "z1")
+        assert mock_save.call_args.args[2] == remote
+        mock_cf.list_records.reset_mock()
+
+        # A failed call means the snapshot can't be trusted: fetch again
+        mock_cf.batch_records.side_effect = CloudflareAPIError(400, [{"message": "no batch"}])
+        mock_cf.delete_record.side_effect = Exception("boom")
+        mock_cf.list_records.return_value = []
+        SyncEngine(alias="test").apply_plan(plan, "token")
+        mock_cf.list_records.assert_called_once_with("token", "z1")
+
+    @pytest.mark.parametrize("status", [0, 429, 502])
+    @patch("dnsctl.core.sync_engine.get_git_manager")
+    @patch("dnsctl.core.sync_engine.save_zone")
+    @patch("dnsctl.core.sync_engine.get_client")
+    def test_apply_does_not_resend_when_batch_outcome_unknown(
+        self, mock_cf_cls, mock_save, mock_git_cls, status,
+    ):
+        mock_cf = MagicMock(spec=CloudflareClient)
+        mock_cf_cls.return_value = mock_cf
+        mock_cf.batch_records.side_effect = CloudflareAPIError(status, [{"message": "lost"}])
+        mock_cf.list_records.return_value = []
+        remote = _sample_records()
+        plan = Plan(zone_name="x.com", zone_id="z1", remote=remote, actions=[
+            PlanAction(action="create", record={"type": "A", "name": "n.x.com", "content": "5.6.7.8"}),
+            PlanAction(action="delete", record=remote[1]),
+        ])
+        result = SyncEngine(alias="test").apply_plan(plan, "token")
+        assert not result.succeeded
+        assert all("outcome unknown" in err for _, err in result.failed)
+        mock_cf.create_record.assert_not_called()
+        mock_cf.delete_record.assert_not_called()
+        mock_cf.list_records.assert_called_once_with("token", "z1")
+
+    @patch("dnsctl.core.sync_engine.get_git_manager")
+    @patch("dnsctl.core.sync_engine.save_zone")
+    @patch("dnsctl.core.sync_engine.get_client")
+    def test_apply_reconciles_short_batch_response(self, mock_cf_cls, mock_save, mock_git_cls):
+        mock_cf = MagicMock(spec=CloudflareClient)
+        mock_cf_cls.return_value = mock_cf
+        remote = _sample_records()
+        new = {"type": "A", "name": "new.x.com", "content": "5.6.7.8"}
+        lost = {"type": "A", "name": "lost.x.com", "content": "5.6.7.8"}
+        changed = dict(remote[0], content="9.9.9.9")
+        mock_cf.batch_records.return_value = {"posts": [dict(new, id="r3")], "puts": []}
+        mock_cf.list_records.return_value = [changed, remote[1], dict(new, id="r3")]
+
+        plan = Plan(zone_name="x.com", zone_id="z1", remote=remote, actions=[
+            PlanAction(action="create", record=new),
+            PlanAction(action="create", record=lost),
+            PlanAction(action="update", record=changed, before=remote[0]),
+        ])
+        result = SyncEngine(alias="test").apply_plan(plan, "token")
+        assert result.succeeded == [plan.actions[0], plan.actions[2]]
+        assert result.failed == [(plan.actions[1], "Create not found in zone after batch")]
+
+
 # ------------------------------------------------------------------
 # Plan data structure
 # ------------------------------------------------------------------
@@ -220,6 +337,7 @@ class TestPlanDataStructure:
             ],
         )
         assert plan.has_protected
+        assert plan.protected_count == 1
 
     def test_no_changes(self):
         plan = Plan(zone_name="x.com", zone_id="z1")